@@ -14,8 +14,10 @@ from app.db.base import Base
 # Import all models to ensure they are registered with SQLAlchemy
 from app.models import (  # noqa: F401
     Customer,
+    DeletionCounter,
     Location,
     Order,
+    OrderDailyStats,
     PopularTrip,
     Service,
     ServiceImage,
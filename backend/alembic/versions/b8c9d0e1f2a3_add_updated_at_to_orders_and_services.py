@@ -0,0 +1,39 @@
+"""add updated_at to orders and services
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Export caching derives a data version from the latest modification
+    op.add_column('orders', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('services', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill with the order creation time, the only modification time we know of
+    op.execute("UPDATE orders SET updated_at = created_at")
+    op.execute("""
+        UPDATE services
+        SET updated_at = orders.created_at
+        FROM orders
+        WHERE orders.id = services.order_id
+    """)
+
+    op.alter_column('orders', 'updated_at', nullable=False)
+    op.alter_column('services', 'updated_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('services', 'updated_at')
+    op.drop_column('orders', 'updated_at')
@@ -0,0 +1,25 @@
+"""add indexes on orders and services updated_at
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Delta exports select the rows changed after a cursor
+    op.create_index(op.f('ix_orders_updated_at'), 'orders', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_services_updated_at'), 'services', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_services_updated_at'), table_name='services')
+    op.drop_index(op.f('ix_orders_updated_at'), table_name='orders')
@@ -0,0 +1,27 @@
+"""add order number sequence
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Order numbers come from this sequence inside the INSERT. The new
+    # ORD-YYYY-NNNNNN numbers have 6+ digits, so they cannot clash with the
+    # existing ORD-YYYY-XXXX (4 hex digits) numbers
+    op.execute(sa.schema.CreateSequence(sa.Sequence('order_number_seq')))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('order_number_seq')))
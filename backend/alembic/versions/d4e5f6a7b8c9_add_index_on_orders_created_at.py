@@ -0,0 +1,23 @@
+"""add index on orders created_at
+
+Revision ID: d4e5f6a7b8c9
+Revises: 827463fbc5e8
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = '827463fbc5e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stats endpoints filter orders on created_at ranges
+    op.create_index(op.f('ix_orders_created_at'), 'orders', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_orders_created_at'), table_name='orders')
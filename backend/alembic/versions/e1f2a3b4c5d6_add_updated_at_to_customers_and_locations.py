@@ -0,0 +1,36 @@
+"""add updated_at to customers and locations
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Customer and location details appear in exports, so their edits
+    # must change the export data version too
+    op.add_column('customers', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('locations', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Backfill: customers with their creation time, locations (which have no
+    # timestamp) with the migration time
+    op.execute("UPDATE customers SET updated_at = created_at")
+    op.execute("UPDATE locations SET updated_at = now()")
+
+    op.alter_column('customers', 'updated_at', nullable=False)
+    op.alter_column('locations', 'updated_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('locations', 'updated_at')
+    op.drop_column('customers', 'updated_at')
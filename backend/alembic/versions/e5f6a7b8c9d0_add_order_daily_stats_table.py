@@ -0,0 +1,46 @@
+"""add order_daily_stats rollup table
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('order_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('total_cost', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('total_sale', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('total_profit', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'user_id')
+    )
+
+    # Backfill from existing orders (same query as rebuild_daily_stats.py)
+    op.execute("""
+        INSERT INTO order_daily_stats (day, user_id, order_count, total_cost, total_sale, total_profit)
+        SELECT
+            CAST(timezone('UTC', created_at) AS DATE),
+            COALESCE(user_id, 0),
+            count(id),
+            sum(total_cost_price),
+            sum(total_sale_price),
+            sum(total_sale_price - total_cost_price)
+        FROM orders
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('order_daily_stats')
@@ -0,0 +1,55 @@
+"""add deletion counter and updated_at indexes for the export data version
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+EXPORTED_TABLES = ('orders', 'services', 'customers', 'locations')
+
+
+def upgrade() -> None:
+    # The export data version reads max(updated_at) of every exported table
+    op.create_index(op.f('ix_customers_updated_at'), 'customers', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_locations_updated_at'), 'locations', ['updated_at'], unique=False)
+
+    # Deletions leave no updated_at behind: triggers count them instead of
+    # the version counting every row
+    op.create_table('deletion_counter',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deletions', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO deletion_counter (id, deletions) VALUES (1, 0)")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_deletions() RETURNS trigger AS $$
+        BEGIN
+            UPDATE deletion_counter SET deletions = deletions + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in EXPORTED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_count_deletions AFTER DELETE ON {table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION count_deletions()"
+        )
+
+
+def downgrade() -> None:
+    for table in EXPORTED_TABLES:
+        op.execute(f"DROP TRIGGER {table}_count_deletions ON {table}")
+    op.execute("DROP FUNCTION count_deletions()")
+    op.drop_table('deletion_counter')
+    op.drop_index(op.f('ix_locations_updated_at'), table_name='locations')
+    op.drop_index(op.f('ix_customers_updated_at'), table_name='customers')
@@ -0,0 +1,66 @@
+"""add sales_count index to popular_trips
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Route rankings are served from popular_trips ordered by sales_count
+    op.create_index(
+        'ix_popular_trips_sales_count',
+        'popular_trips',
+        [sa.text('sales_count DESC')],
+        unique=False
+    )
+
+    # Rankings now read the counters directly, but they were never lowered
+    # when services or orders were deleted. Recompute them from the services
+    # table (same rules as reconcile_sales_counters.py)
+    op.execute("""
+        UPDATE popular_trips
+        SET sales_count = COALESCE((
+            SELECT count(services.id)
+            FROM services
+            WHERE services.service_type IN ('FLIGHT', 'BUS')
+              AND services.origin_location_id = popular_trips.origin_location_id
+              AND services.destination_location_id = popular_trips.destination_location_id
+        ), 0)
+    """)
+    op.execute("""
+        INSERT INTO popular_trips (origin_location_id, destination_location_id, sales_count)
+        SELECT origin_location_id, destination_location_id, count(id)
+        FROM services
+        WHERE service_type IN ('FLIGHT', 'BUS')
+          AND origin_location_id IS NOT NULL
+          AND destination_location_id IS NOT NULL
+        GROUP BY origin_location_id, destination_location_id
+        ON CONFLICT ON CONSTRAINT unique_route DO NOTHING
+    """)
+    op.execute("""
+        UPDATE users
+        SET sales_count = COALESCE((
+            SELECT count(services.id)
+            FROM services
+            JOIN orders ON services.order_id = orders.id
+            WHERE services.service_type IN ('FLIGHT', 'BUS')
+              AND services.origin_location_id IS NOT NULL
+              AND services.destination_location_id IS NOT NULL
+              AND orders.user_id = users.id
+        ), 0)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_popular_trips_sales_count', table_name='popular_trips')
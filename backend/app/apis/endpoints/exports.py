@@ -1,20 +1,48 @@
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status as http_status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from datetime import date
-import io
+from datetime import date, datetime
 
+from app.core.config import settings
 from app.db.session import get_db
+from app.schemas.export import ExportDelta, ExportJob as ExportJobSchema, ExportJobCreate
 from app.services import export_service
+from app.services.export_job_service import ExportJob, export_jobs
 from app.apis.dependencies import get_current_user, get_current_superuser
 from app.models.user import User
 
 router = APIRouter()
 
 
+async def _cached_export_response(
+    request: Request,
+    db: AsyncSession,
+    format: str,
+    media_type: str,
+    filename: str,
+    **filters
+) -> Response:
+    """
+    Serve an export from the file cache, revalidating with its ETag.
+
+    The ETag is derived from the cache key (format, filters and data
+    version), so a matching If-None-Match is answered with 304 before
+    anything is built or read.
+    """
+    key = await export_service.export_cache_key(db, format, **filters)
+    etag = export_service.export_etag(key)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=http_status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = await export_service.get_cached_export(db, key)
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
+
 @router.get("/excel")
 async def export_to_excel(
+    request: Request,
     start_date: Optional[date] = Query(None, description="Start date for filtering orders"),
     end_date: Optional[date] = Query(None, description="End date for filtering orders"),
     status: Optional[str] = Query(None, description="Filter by order status"),
@@ -24,28 +52,167 @@ async def export_to_excel(
 ):
     """
     Export orders to Excel format with optional filters.
+    Repeated downloads of unchanged data are served from the export cache.
+    """
+    return await _cached_export_response(
+        request,
+        db,
+        "excel",
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename=f"orders_export_{date.today().strftime('%Y%m%d')}.xlsx",
+        start_date=start_date,
+        end_date=end_date,
+        status=status,
+        service_type=service_type
+    )
+
+
+@router.get("/pdf")
+async def export_to_pdf(
+    request: Request,
+    start_date: Optional[date] = Query(None, description="Start date for filtering orders"),
+    end_date: Optional[date] = Query(None, description="End date for filtering orders"),
+    status: Optional[str] = Query(None, description="Filter by order status"),
+    service_type: Optional[str] = Query(None, description="Filter by service type"),
+    _: User = Depends(get_current_superuser),  # Admin only
+    db: AsyncSession = Depends(get_db)
+):
     """
-    # Generate Excel file
-    excel_file = await export_service.export_orders_to_excel(
-        db=db,
+    Export orders to PDF format with optional filters.
+    Repeated downloads of unchanged data are served from the export cache.
+    """
+    return await _cached_export_response(
+        request,
+        db,
+        "pdf",
+        media_type="application/pdf",
+        filename=f"orders_report_{date.today().strftime('%Y%m%d')}.pdf",
         start_date=start_date,
         end_date=end_date,
         status=status,
         service_type=service_type
     )
 
-    # Return as streaming response
+
+@router.get("/csv")
+async def export_to_csv(
+    start_date: Optional[date] = Query(None, description="Start date for filtering orders"),
+    end_date: Optional[date] = Query(None, description="End date for filtering orders"),
+    status: Optional[str] = Query(None, description="Filter by order status"),
+    service_type: Optional[str] = Query(None, description="Filter by service type"),
+    _: User = Depends(get_current_superuser),  # Admin only
+):
+    """
+    Export orders to CSV, streamed straight from the database.
+    """
     return StreamingResponse(
-        io.BytesIO(excel_file),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        export_service.iter_orders_csv(
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+            service_type=service_type
+        ),
+        media_type="text/csv; charset=utf-8",
         headers={
-            "Content-Disposition": f"attachment; filename=orders_export_{date.today().strftime('%Y%m%d')}.xlsx"
+            "Content-Disposition": f"attachment; filename=orders_export_{date.today().strftime('%Y%m%d')}.csv"
         }
     )
 
 
-@router.get("/pdf")
-async def export_to_pdf(
+@router.get("/ndjson")
+async def export_to_ndjson(
+    start_date: Optional[date] = Query(None, description="Start date for filtering orders"),
+    end_date: Optional[date] = Query(None, description="End date for filtering orders"),
+    status: Optional[str] = Query(None, description="Filter by order status"),
+    service_type: Optional[str] = Query(None, description="Filter by service type"),
+    _: User = Depends(get_current_superuser),  # Admin only
+):
+    """
+    Export orders as newline-delimited JSON, streamed straight from the database.
+    """
+    return StreamingResponse(
+        export_service.iter_orders_ndjson(
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+            service_type=service_type
+        ),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f"attachment; filename=orders_export_{date.today().strftime('%Y%m%d')}.ndjson"
+        }
+    )
+
+
+@router.get("/parquet")
+async def export_to_parquet(
+    start_date: Optional[date] = Query(None, description="Start date for filtering orders"),
+    end_date: Optional[date] = Query(None, description="End date for filtering orders"),
+    status: Optional[str] = Query(None, description="Filter by order status"),
+    service_type: Optional[str] = Query(None, description="Filter by service type"),
+    _: User = Depends(get_current_superuser),  # Admin only
+):
+    """
+    Export orders to Parquet, streamed one row group at a time.
+    """
+    try:
+        content = export_service.iter_orders_parquet(
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+            service_type=service_type
+        )
+    except ImportError:
+        raise HTTPException(
+            status_code=http_status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export library not installed. Run: pip install pyarrow",
+        )
+
+    return StreamingResponse(
+        content,
+        media_type="application/vnd.apache.parquet",
+        headers={
+            "Content-Disposition": f"attachment; filename=orders_export_{date.today().strftime('%Y%m%d')}.parquet"
+        }
+    )
+
+
+@router.get("/arrow")
+async def export_to_arrow(
+    start_date: Optional[date] = Query(None, description="Start date for filtering orders"),
+    end_date: Optional[date] = Query(None, description="End date for filtering orders"),
+    status: Optional[str] = Query(None, description="Filter by order status"),
+    service_type: Optional[str] = Query(None, description="Filter by service type"),
+    _: User = Depends(get_current_superuser),  # Admin only
+):
+    """
+    Export orders as an Arrow IPC file, streamed one record batch at a time.
+    """
+    try:
+        content = export_service.iter_orders_arrow(
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+            service_type=service_type
+        )
+    except ImportError:
+        raise HTTPException(
+            status_code=http_status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Arrow export library not installed. Run: pip install pyarrow",
+        )
+
+    return StreamingResponse(
+        content,
+        media_type="application/vnd.apache.arrow.file",
+        headers={
+            "Content-Disposition": f"attachment; filename=orders_export_{date.today().strftime('%Y%m%d')}.arrow"
+        }
+    )
+
+
+@router.get("/delta", response_model=ExportDelta)
+async def export_delta(
+    since: Optional[datetime] = Query(None, description="Cursor: next_cursor from the previous sync"),
     start_date: Optional[date] = Query(None, description="Start date for filtering orders"),
     end_date: Optional[date] = Query(None, description="End date for filtering orders"),
     status: Optional[str] = Query(None, description="Filter by order status"),
@@ -54,22 +221,115 @@ async def export_to_pdf(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Export orders to PDF format with optional filters.
+    Export only the rows created or changed since the cursor, for incremental sync.
+    Pass the returned next_cursor as since on the next call.
     """
-    # Generate PDF file
-    pdf_file = await export_service.export_orders_to_pdf(
-        db=db,
+    delta = await export_service.fetch_export_delta(
+        db,
+        since=since,
         start_date=start_date,
         end_date=end_date,
         status=status,
         service_type=service_type
     )
+    return ExportDelta(
+        since=since,
+        next_cursor=delta.next_cursor,
+        count=len(delta.rows),
+        rows=[
+            dict(zip(export_service.FLAT_EXPORT_COLUMNS, export_service._flat_values(row), strict=True))
+            for row in delta.rows
+        ],
+    )
+
+
+def _job_response(job: ExportJob) -> ExportJobSchema:
+    """Build the API representation of an export job."""
+    download_url = None
+    if job.status == "completed":
+        download_url = f"{settings.API_V1_PREFIX}/exports/jobs/{job.id}/download"
+    return ExportJobSchema(
+        id=job.id,
+        format=job.format,
+        status=job.status,
+        phase=job.progress.phase,
+        rows_processed=job.progress.rows_processed,
+        total_rows=job.progress.total_rows,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+        download_url=download_url,
+    )
+
+
+def _get_job_or_404(job_id: str) -> ExportJob:
+    """Look up an export job, raising 404 when unknown or expired."""
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            detail="Export job not found or expired"
+        )
+    return job
+
+
+@router.post("/jobs", response_model=ExportJobSchema, status_code=http_status.HTTP_202_ACCEPTED)
+async def create_export_job(
+    job_in: ExportJobCreate,
+    _: User = Depends(get_current_superuser),  # Admin only
+):
+    """
+    Start a background export.
+
+    Poll GET /exports/jobs/{job_id} for progress and download the file from
+    the returned download_url once the job is completed. Submitting the same
+    format and filters again returns the existing job while data is unchanged.
+    """
+    try:
+        job = await export_jobs.submit(
+            job_in.format,
+            start_date=job_in.start_date,
+            end_date=job_in.end_date,
+            status=job_in.status,
+            service_type=job_in.service_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobSchema)
+async def get_export_job(
+    job_id: str,
+    _: User = Depends(get_current_superuser),  # Admin only
+):
+    """
+    Get the status and progress of a background export.
+    """
+    return _job_response(_get_job_or_404(job_id))
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_export_job(
+    job_id: str,
+    _: User = Depends(get_current_superuser),  # Admin only
+):
+    """
+    Download the file of a completed background export.
+    """
+    job = _get_job_or_404(job_id)
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=http_status.HTTP_409_CONFLICT,
+            detail=f"Export job is {job.status}"
+        )
 
-    # Return as streaming response
     return StreamingResponse(
-        io.BytesIO(pdf_file),
-        media_type="application/pdf",
+        job.file.iter_chunks(),
+        media_type=job.media_type,
         headers={
-            "Content-Disposition": f"attachment; filename=orders_report_{date.today().strftime('%Y%m%d')}.pdf"
+            "Content-Disposition": f"attachment; filename={job.filename}",
+            "Content-Length": str(job.file.size)
         }
     )
@@ -1,8 +1,9 @@
 """Order and service management endpoints."""
 
-from datetime import datetime
+from datetime import date, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.apis.dependencies import get_current_active_user
@@ -10,7 +11,9 @@ from app.db.session import get_db
 from app.models.user import User
 from app.schemas import order as order_schemas
 from app.schemas import service as service_schemas
-from app.services import order_service
+from app.schemas.voucher import VoucherBatch
+from app.services import order_service, voucher_service
+from app.services.export_service import ExportFile
 
 router = APIRouter()
 
@@ -38,6 +41,30 @@ async def create_order(
         )
 
 
+@router.post("/with-services", response_model=order_schemas.OrderWithDetails, status_code=status.HTTP_201_CREATED)
+async def create_order_with_services(
+    order_data: order_schemas.OrderCreateWithServices,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create an order with all of its services (e.g. a full itinerary) in one request.
+
+    The order and its services are created in a single transaction. A
+    luggage service can reference another service of the same request with
+    associated_service_index (its position in the services list).
+
+    Requires authentication.
+    """
+    try:
+        return await order_service.create_order_with_services(db, order_data, current_user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.get("/", response_model=list[order_schemas.Order])
 async def list_orders(
     user_id: int | None = Query(None, description="Filter by operator ID"),
@@ -123,6 +150,67 @@ async def get_order_details(
     return order
 
 
+def _voucher_response(voucher_file: ExportFile, media_type: str, filename: str) -> StreamingResponse:
+    """Stream a generated voucher file as a download."""
+    return StreamingResponse(
+        voucher_file.iter_chunks(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(voucher_file.size)
+        }
+    )
+
+
+@router.post("/vouchers")
+async def print_vouchers(
+    batch: VoucherBatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Print the vouchers of several orders (e.g. a group trip).
+
+    Returns a ZIP with one PDF per order, or a single PDF with one voucher
+    per order when format is "pdf".
+
+    Requires authentication.
+    """
+    try:
+        voucher_file = await voucher_service.build_vouchers(db, batch.order_ids, batch.format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    stamp = date.today().strftime('%Y%m%d')
+    if batch.format == "pdf":
+        return _voucher_response(voucher_file, "application/pdf", f"vouchers_{stamp}.pdf")
+    return _voucher_response(voucher_file, "application/zip", f"vouchers_{stamp}.zip")
+
+
+@router.get("/{order_id}/voucher")
+async def print_voucher(
+    order_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Print the voucher of one order as a PDF.
+
+    Requires authentication.
+    """
+    try:
+        voucher_file = await voucher_service.build_vouchers(db, [order_id], "pdf")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Order with id {order_id} not found"
+        )
+    return _voucher_response(voucher_file, "application/pdf", f"voucher_{order_id}.pdf")
+
+
 @router.put("/{order_id}", response_model=order_schemas.Order)
 async def update_order(
     order_id: int,
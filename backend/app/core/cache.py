@@ -0,0 +1,163 @@
+"""In-process TTL result cache for read-heavy endpoints."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+def freeze(value: Any) -> Any:
+    """Turn lists, sets and dicts into hashable equivalents for cache keys."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    return value
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a TTL.
+
+    Keys include a data version. Writers call invalidate_on_commit(), which
+    bumps it once their transaction commits, so entries computed from older
+    data are never served again, even if a computation that started before
+    the write finishes after it.
+
+    The cache lives in the process: with several uvicorn workers each one has
+    its own copy, and the TTL bounds how stale another worker's copy can be.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data_version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any) -> tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Returns:
+            (found, value); value is None when not found or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def set(self, key: Any, value: Any, ttl: float | None = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Lifetime in seconds for this entry (defaults to the cache TTL)
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def bump_data_version(self) -> None:
+        """Invalidate everything cached so far after the underlying data changed."""
+        self.data_version += 1
+        self._entries.clear()
+
+    def clear(self) -> None:
+        """Drop all entries without changing the data version."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Counters for monitoring."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "data_version": self.data_version,
+        }
+
+
+# Shared cache for statistics endpoints, invalidated by order/customer writes
+stats_cache = TTLCache(
+    maxsize=settings.STATS_CACHE_MAX_ENTRIES,
+    ttl=settings.STATS_CACHE_TTL_SECONDS,
+)
+
+
+# Session.info key holding the caches to invalidate when the transaction commits
+_PENDING_INVALIDATIONS = "pending_cache_invalidations"
+
+
+def invalidate_on_commit(db: Any, cache: TTLCache = stats_cache) -> None:
+    """
+    Bump the cache's data version when the session's transaction commits.
+
+    Writers call this instead of bumping right away: a reader racing the
+    write could otherwise cache data that is not committed yet, and a
+    rolled back transaction invalidates nothing.
+
+    Args:
+        db: Session (sync or async) performing the write
+        cache: Cache to invalidate
+    """
+    db.info.setdefault(_PENDING_INVALIDATIONS, set()).add(cache)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for cache in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        cache.bump_data_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+def cached(namespace: str, cache: TTLCache = stats_cache, ttl: float | None = None) -> Callable:
+    """
+    Cache the result of an async service function taking a db session first.
+
+    The key is built from the namespace, the cache's data version and every
+    argument except the session.
+
+    Args:
+        namespace: Name identifying the cached function (usually the endpoint)
+        cache: Cache to store results in
+        ttl: Lifetime in seconds of the results (defaults to the cache TTL)
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @wraps(func)
+        async def wrapper(db: Any, *args: Any, **kwargs: Any) -> Any:
+            key = (namespace, cache.data_version, freeze(args), freeze(kwargs))
+            found, value = cache.get(key)
+            if found:
+                return value
+
+            value = await func(db, *args, **kwargs)
+            cache.set(key, value, ttl=ttl)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,120 @@
+"""Single-flight coalescing of identical concurrent async calls."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any
+
+from app.core.cache import TTLCache, freeze
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark a failed future as handled even when no follower awaited it."""
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """
+    Run one computation per key at a time and share its result.
+
+    The first caller for a key (the leader) runs the computation; callers
+    arriving while it is in flight await the same future instead of running
+    it again. Errors are propagated to every waiter. If the leader is
+    cancelled, a waiting follower takes over and runs the computation itself.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+        self._in_flight: dict[Any, asyncio.Future] = {}
+
+    async def do(self, key: Any, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func for key, or wait for the identical call already in flight.
+
+        Args:
+            key: Hashable key identifying identical calls
+            func: Zero-argument coroutine function performing the work
+
+        Returns:
+            The result of the (possibly shared) computation
+        """
+        self.calls += 1
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # This caller was cancelled, not the leader
+                # The leader was cancelled: retry, most likely as the new leader
+                self.calls -= 1
+                self.deduplicated -= 1
+                return await self.do(key, func)
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_retrieve_exception)
+        self._in_flight[key] = future
+        self.executions += 1
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> dict[str, int]:
+        """Counters for monitoring."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Shared coalescer for expensive GET endpoints (stats and exports)
+request_coalescer = SingleFlight()
+
+
+def coalesced(
+    namespace: str,
+    group: SingleFlight = request_coalescer,
+    cache: TTLCache | None = None,
+) -> Callable:
+    """
+    Coalesce concurrent identical calls of an async service function.
+
+    The function must take a db session first; the key is built from the
+    namespace and every other argument. Waiters receive the leader's result,
+    so it must not be mutated by callers.
+
+    Args:
+        namespace: Name identifying the coalesced function
+        group: SingleFlight instance that tracks in-flight calls
+        cache: Cache whose data version joins the key, so a call made after a
+            committed write never joins a computation started before it
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @wraps(func)
+        async def wrapper(db: Any, *args: Any, **kwargs: Any) -> Any:
+            version = None if cache is None else cache.data_version
+            key = (namespace, version, freeze(args), freeze(kwargs))
+            return await group.do(key, lambda: func(db, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
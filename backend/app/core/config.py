@@ -24,6 +24,28 @@ class Settings(BaseSettings):
     # Google OAuth
     GOOGLE_CLIENT_ID: str = ""
 
+    # Stats result cache
+    STATS_CACHE_TTL_SECONDS: int = 30
+    STATS_CACHE_MAX_ENTRIES: int = 256
+    # Results for periods that already ended only change when old orders are edited
+    STATS_CLOSED_PERIOD_CACHE_TTL_SECONDS: int = 3600
+
+    # Exports
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per round trip from the server-side cursor
+    EXPORT_ROW_GROUP_SIZE: int = 50000  # Rows per Parquet row group / Arrow record batch
+    EXPORT_PDF_TABLE_ROWS: int = 500  # Rows per LongTable chunk of the PDF report
+    EXPORT_RENDER_POOL: str = "thread"  # "thread" or "process"
+    EXPORT_RENDER_WORKERS: int = 2
+    EXPORT_JOB_MAX_CONCURRENCY: int = 2  # Background export jobs rendering at once
+    EXPORT_JOB_TTL_SECONDS: int = 3600  # How long finished job files stay downloadable
+    EXPORT_JOB_PURGE_INTERVAL_SECONDS: int = 60  # How often expired jobs and their files are dropped
+    EXPORT_CACHE_DIR: str = "export_cache"  # Generated Excel/PDF reports reused across downloads
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    EXPORT_DELTA_LAG_SECONDS: int = 60  # Delta cursors stay this far behind now, for late commits
+    VOUCHER_MAX_ORDERS: int = 500  # Largest voucher batch accepted in one request
+    VOUCHER_CHUNK_SIZE: int = 25  # Vouchers per render pool task
+    VOUCHER_RENDER_WORKERS: int = 0  # Processes rendering voucher chunks (0: one per CPU)
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
     @property
@@ -0,0 +1,175 @@
+"""Disk-backed file cache with least-recently-used eviction by total size."""
+
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.cache import freeze
+from app.core.config import settings
+
+
+class FileCache:
+    """
+    Directory of generated files kept under a total size budget.
+
+    Files are named after a digest of their key, so every uvicorn worker
+    sharing the directory finds the same entries. Recency is the file's
+    modification time: hits touch it, and put() removes the least recently
+    used files until the directory fits in max_bytes again.
+    """
+
+    # Staged files older than this were left behind by a put() that crashed or
+    # was cancelled (a put in progress in another worker is much younger)
+    STAGED_FILE_MAX_AGE_SECONDS = 3600
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def incoming(self) -> Path:
+        """Staging directory of files being moved into the cache."""
+        return self.directory / ".incoming"
+
+    @staticmethod
+    def key_digest(key: Any) -> str:
+        """Stable digest of a key (also usable as an ETag)."""
+        return hashlib.sha256(repr(freeze(key)).encode()).hexdigest()[:32]
+
+    def _path(self, key: Any, suffix: str) -> Path:
+        return self.directory / f"{self.key_digest(key)}{suffix}"
+
+    def get(self, key: Any, suffix: str) -> Optional[Path]:
+        """
+        Look up a cached file and mark it as recently used.
+
+        Returns:
+            Path of the cached file, or None on a miss
+        """
+        path = self._path(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: Any, suffix: str, source: str) -> Path:
+        """
+        Move a generated file into the cache, then evict down to the size budget.
+
+        Args:
+            key: Cache key
+            suffix: File extension, including the dot
+            source: Path of the generated file (moved, not copied)
+
+        Returns:
+            Path of the cached file
+        """
+        self.incoming.mkdir(parents=True, exist_ok=True)
+        path = self._path(key, suffix)
+
+        # Stage next to the cache first (the source may be on another
+        # filesystem) so readers never see a partially written file
+        staged = self.incoming / f"{uuid.uuid4().hex}{suffix}"
+        try:
+            shutil.move(source, staged)
+            os.replace(staged, path)
+        except BaseException:
+            staged.unlink(missing_ok=True)
+            raise
+
+        self.evict(keep=path)
+        return path
+
+    def _files(self) -> list[Path]:
+        """Cached files (staging area excluded)."""
+        if not self.directory.exists():
+            return []
+        return [path for path in self.directory.iterdir() if path.is_file()]
+
+    def sweep_incoming(self) -> int:
+        """
+        Remove staged files abandoned by an interrupted put().
+
+        They are not cache entries, so evict() would otherwise never count
+        them against max_bytes. Runs on startup and on every eviction.
+
+        Returns:
+            Number of files removed
+        """
+        if not self.incoming.exists():
+            return 0
+
+        cutoff = time.time() - self.STAGED_FILE_MAX_AGE_SECONDS
+        removed = 0
+        for path in self.incoming.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """
+        Remove least recently used files until the total size fits in max_bytes.
+
+        Stale staged files are swept first (see sweep_incoming).
+
+        Args:
+            keep: File that must not be removed (the one just stored)
+
+        Returns:
+            Number of files removed
+        """
+        self.sweep_incoming()
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached file."""
+        for path in self._files():
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss counters and current size, for diagnostics."""
+        sizes = [path.stat().st_size for path in self._files()]
+        return {
+            "files": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+export_file_cache = FileCache(settings.EXPORT_CACHE_DIR, settings.EXPORT_CACHE_MAX_BYTES)
@@ -0,0 +1,85 @@
+"""
+Worker pools for CPU-bound rendering (Excel/PDF exports, vouchers).
+
+Running openpyxl or reportlab inside an async handler blocks the event
+loop, stalling every other request served by the same worker. Rendering
+functions are submitted here instead. The export pool is a thread pool or
+a process pool depending on EXPORT_RENDER_POOL. Voucher batches are split
+into chunks rendered in parallel, which threads cannot do for pure Python
+reportlab work (the GIL serializes it), so vouchers always get their own
+process pool. Functions and arguments must be picklable for a process
+pool, so callers pass plain tuples and file paths, never ORM objects or
+sessions.
+"""
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional
+
+from app.core.config import settings
+
+RENDER_POOL_KINDS = ("thread", "process")
+
+_render_pool: Optional[Executor] = None
+_voucher_pool: Optional[Executor] = None
+
+
+def create_render_pool(kind: str, max_workers: int) -> Executor:
+    """
+    Create a rendering executor.
+
+    Args:
+        kind: "thread" or "process"
+        max_workers: Number of workers
+
+    Returns:
+        A new executor
+
+    Raises:
+        ValueError: If kind is not a known pool kind
+    """
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="render")
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Invalid render pool '{kind}'. Must be one of: {', '.join(RENDER_POOL_KINDS)}")
+
+
+def get_render_pool() -> Executor:
+    """Return the shared rendering executor, creating it on first use."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = create_render_pool(settings.EXPORT_RENDER_POOL, settings.EXPORT_RENDER_WORKERS)
+    return _render_pool
+
+
+async def run_in_render_pool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run func(*args, **kwargs) in the rendering pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_pool(), partial(func, *args, **kwargs))
+
+
+def get_voucher_pool() -> Executor:
+    """Return the voucher rendering process pool, creating it on first use."""
+    global _voucher_pool
+    if _voucher_pool is None:
+        _voucher_pool = create_render_pool("process", settings.VOUCHER_RENDER_WORKERS or os.cpu_count() or 1)
+    return _voucher_pool
+
+
+async def run_in_voucher_pool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run func(*args, **kwargs) in the voucher rendering pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_voucher_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_render_pool() -> None:
+    """Shut the rendering executors down (on application shutdown)."""
+    global _render_pool, _voucher_pool
+    for pool in (_render_pool, _voucher_pool):
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    _render_pool = None
+    _voucher_pool = None
@@ -25,7 +25,12 @@ AsyncSessionLocal = sessionmaker(
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency for getting async database sessions."""
+    """
+    Dependency for getting async database sessions.
+
+    The request is one unit of work: service functions only flush, and the
+    transaction is committed once here (or rolled back on error).
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -6,6 +7,24 @@ from fastapi.staticfiles import StaticFiles
 
 from app.apis.api import api_router
 from app.core.config import settings
+from app.core.file_cache import export_file_cache
+from app.core.workers import shutdown_render_pool
+from app.services.export_job_service import export_jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Sweep files left by interrupted export cache writes and purge expired
+    export jobs periodically; stop the jobs and release the export rendering
+    pool on shutdown.
+    """
+    export_file_cache.sweep_incoming()
+    export_jobs.start_purging()
+    yield
+    await export_jobs.shutdown()
+    shutdown_render_pool()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -14,6 +33,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url=f"{settings.API_V1_PREFIX}/docs",
     redoc_url=f"{settings.API_V1_PREFIX}/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -1,6 +1,8 @@
 from app.models.customer import Customer
+from app.models.deletion_counter import DeletionCounter
 from app.models.location import Location
 from app.models.order import Order
+from app.models.order_daily_stats import OrderDailyStats
 from app.models.popular_trip import PopularTrip
 from app.models.service import Service, ServiceType
 from app.models.service_image import ServiceImage
@@ -9,8 +11,10 @@ from app.models.user import User
 __all__ = [
     "User",
     "Customer",
+    "DeletionCounter",
     "Location",
     "Order",
+    "OrderDailyStats",
     "Service",
     "ServiceType",
     "ServiceImage",
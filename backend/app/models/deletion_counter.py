@@ -0,0 +1,52 @@
+from sqlalchemy import DDL, BigInteger, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+# Tables whose rows appear in exports; deleting from them changes the export data version
+EXPORTED_TABLES = ("orders", "services", "customers", "locations")
+
+
+class DeletionCounter(Base):
+    """
+    Number of DELETE statements run against the exported tables (one row).
+
+    Deletions leave no updated_at behind, so statement-level triggers bump
+    this row instead and the export data version reads it with a primary
+    key lookup. The bump is part of the deleting transaction, so readers
+    never see it before the deletion itself.
+    """
+
+    __tablename__ = "deletion_counter"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    deletions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+# Same DDL as migration f2a3b4c5d6e7, for databases built with create_all (tests)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL("INSERT INTO deletion_counter (id, deletions) VALUES (1, 0) ON CONFLICT (id) DO NOTHING"),
+)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION count_deletions() RETURNS trigger AS $$
+        BEGIN
+            UPDATE deletion_counter SET deletions = deletions + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """),
+)
+for _table in EXPORTED_TABLES:
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER {_table}_count_deletions AFTER DELETE ON {_table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION count_deletions()"
+        ),
+    )
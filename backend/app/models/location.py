@@ -1,5 +1,6 @@
-from sqlalchemy import String, Numeric
+from sqlalchemy import DateTime, String, Numeric
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from datetime import datetime
 from decimal import Decimal
 
 from app.db.base import Base
@@ -17,6 +18,9 @@ class Location(Base):
     airport_code: Mapped[str | None] = mapped_column(String(10))
     latitude: Mapped[Decimal | None] = mapped_column(Numeric(10, 7))
     longitude: Mapped[Decimal | None] = mapped_column(Numeric(10, 7))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True
+    )
 
     # Relationships for services (origin and destination)
     services_as_origin: Mapped[list["Service"]] = relationship(
@@ -6,8 +6,10 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
+    Sequence,
     String,
     Text,
     text
@@ -16,6 +18,18 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
+# Backs the order numbers; numbers keep counting across years, so a number is
+# never handed out twice even though the year prefix changes
+ORDER_NUMBER_SEQUENCE = Sequence("order_number_seq", metadata=Base.metadata)
+
+# Rendered inline in the INSERT (and read back through RETURNING), so numbering
+# costs no extra round trip. Format: ORD-YYYY-NNNNNN, padded to at least 6 digits
+NEXT_ORDER_NUMBER = text(
+    "(SELECT 'ORD-' || to_char(now(), 'YYYY') || '-' "
+    "|| lpad(n::text, greatest(length(n::text), 6), '0') "
+    "FROM nextval('order_number_seq') AS n)"
+)
+
 
 class Order(Base):
     """Order model for purchase orders. All orders are considered paid."""
@@ -23,7 +37,9 @@ class Order(Base):
     __tablename__ = "orders"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    order_number: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
+    order_number: Mapped[str] = mapped_column(
+        String(50), default=NEXT_ORDER_NUMBER, unique=True, nullable=False, index=True
+    )
     # custom_ticket_number: Mapped[str | None] = mapped_column(String(100), index=True)  # User-provided ticket number - Column doesn't exist in DB yet
     user_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("users.id", ondelete="SET NULL"), index=True)
     customer_id: Mapped[int] = mapped_column(Integer, ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False, index=True)
@@ -33,7 +49,10 @@ class Order(Base):
     # attachment_urls: Mapped[str | None] = mapped_column(Text)  # JSON array of file URLs (PDFs, images) - Column doesn't exist in DB yet
     # total_profit is calculated in application logic (not as a generated column for SQLAlchemy compatibility)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False, index=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True
     )
 
     # Relationships
@@ -43,6 +62,11 @@ class Order(Base):
         "Service", back_populates="order", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Per-operator rankings over a date window
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+    )
+
     @property
     def total_profit(self) -> Decimal:
         """Calculate profit as sale_price - cost_price."""
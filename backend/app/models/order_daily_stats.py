@@ -0,0 +1,26 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class OrderDailyStats(Base):
+    """
+    Daily sales rollup per operator.
+
+    Maintained incrementally by order_service so the stats endpoints aggregate
+    one row per day and operator instead of every order. Days are UTC dates of
+    orders.created_at. Orders without an operator are stored under user_id 0.
+    """
+
+    __tablename__ = "order_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    order_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_cost: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0.00"), nullable=False)
+    total_sale: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0.00"), nullable=False)
+    total_profit: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0.00"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -30,7 +30,8 @@ class PopularTrip(Base):
         foreign_keys=[destination_location_id]
     )
 
-    # Unique constraint to avoid duplicate routes
+    # Unique constraint to avoid duplicate routes, index for the ranking
     __table_args__ = (
         UniqueConstraint('origin_location_id', 'destination_location_id', name='unique_route'),
+        Index('ix_popular_trips_sales_count', sales_count.desc()),
     )
@@ -84,6 +84,9 @@ class Service(Base):
     associated_service_id: Mapped[int | None] = mapped_column(
         Integer, ForeignKey("services.id", ondelete="SET NULL")
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True
+    )
 
     # Relationships
     order: Mapped["Order"] = relationship("Order", back_populates="services")
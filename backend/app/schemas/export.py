@@ -0,0 +1,42 @@
+from datetime import date, datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+# Type alias for the formats background export jobs can produce
+ExportJobFormat = Literal["excel", "pdf"]
+
+
+class ExportJobCreate(BaseModel):
+    """Schema for submitting a background export job."""
+
+    format: ExportJobFormat
+    start_date: date | None = None
+    end_date: date | None = None
+    status: str | None = None
+    service_type: str | None = None
+
+
+class ExportJob(BaseModel):
+    """Background export job status for API responses."""
+
+    id: str
+    format: ExportJobFormat
+    status: str
+    phase: str
+    rows_processed: int
+    total_rows: int | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+    expires_at: datetime | None = None
+    download_url: str | None = None
+
+
+class ExportDelta(BaseModel):
+    """Rows changed since a cursor, for incremental sync."""
+
+    since: datetime | None = None
+    next_cursor: datetime | None = None
+    count: int
+    rows: list[dict[str, Any]]
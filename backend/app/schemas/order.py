@@ -3,7 +3,9 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.schemas.service import ServiceCreateNested
 
 
 class OrderBase(BaseModel):
@@ -21,6 +23,12 @@ class OrderCreate(OrderBase):
     pass
 
 
+class OrderCreateWithServices(OrderCreate):
+    """Schema for creating an order together with all of its services."""
+
+    services: list[ServiceCreateNested] = Field(min_length=1)
+
+
 class OrderUpdate(BaseModel):
     """Schema for updating order information."""
 
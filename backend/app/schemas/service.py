@@ -75,6 +75,14 @@ class ServiceCreate(ServiceBase):
     order_id: int
 
 
+class ServiceCreateNested(ServiceBase):
+    """Schema for a service created together with its order."""
+
+    # Luggage can point at a service of the same request by its position
+    # in the list (its ID does not exist yet)
+    associated_service_index: int | None = None
+
+
 class ServiceUpdate(BaseModel):
     """Schema for updating service information."""
 
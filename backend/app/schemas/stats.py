@@ -4,6 +4,7 @@ from decimal import Decimal
 from pydantic import BaseModel
 
 from app.schemas.location import Location
+from app.schemas.user import User
 
 
 class PopularTripBase(BaseModel):
@@ -102,9 +103,41 @@ class TargetData(BaseModel):
     current_direction: str  # 'up' or 'down'
 
 
+class TargetsData(BaseModel):
+    """Daily, monthly and annual target progress for the dashboard cards."""
+
+    daily: TargetData
+    monthly: TargetData
+    annual: TargetData
+
+
 class StatisticsChartData(BaseModel):
     """Statistics chart data for sales and profit."""
 
     year: int
     sales: list[int]  # 12 months of sales counts
     profit: list[float]  # 12 months of profit amounts (in hundreds)
+
+
+class TopSeller(BaseModel):
+    """Operator ranking entry for a date window."""
+
+    id: int
+    full_name: str
+    email: str
+    avatar: str | None = None
+    order_count: int
+    total_sales: Decimal
+    total_profit: Decimal
+
+
+class DashboardData(BaseModel):
+    """Every dashboard section in one response, with per-section timings."""
+
+    metrics: DashboardMetrics
+    targets: TargetsData
+    monthly_sales: YearlySalesData
+    statistics_chart: StatisticsChartData
+    popular_trips: list[PopularTripWithDetails]
+    top_sellers: list[User]
+    timings_ms: dict[str, float]  # Milliseconds per section, plus "total"
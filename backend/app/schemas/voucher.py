@@ -0,0 +1,13 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+# Type alias for the voucher batch outputs: a ZIP of per-order PDFs or one merged PDF
+VoucherFormat = Literal["zip", "pdf"]
+
+
+class VoucherBatch(BaseModel):
+    """Schema for printing the vouchers of several orders at once."""
+
+    order_ids: list[int] = Field(min_length=1)
+    format: VoucherFormat = "zip"
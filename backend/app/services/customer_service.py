@@ -3,6 +3,7 @@
 from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import invalidate_on_commit
 from app.models.customer import Customer
 from app.schemas import customer as schemas
 
@@ -23,7 +24,8 @@ async def create_customer(
     """
     new_customer = Customer(**customer_data.model_dump())
     db.add(new_customer)
-    await db.commit()
+    await db.flush()
+    invalidate_on_commit(db)
     await db.refresh(new_customer)
     return new_customer
 
@@ -102,6 +104,6 @@ async def update_customer(
     for field, value in update_data.items():
         setattr(customer, field, value)
 
-    await db.commit()
+    await db.flush()
     await db.refresh(customer)
     return customer
@@ -0,0 +1,118 @@
+"""Incremental maintenance of the order_daily_stats rollup table."""
+
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, cast, delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_on_commit
+from app.models.order import Order
+from app.models.order_daily_stats import OrderDailyStats
+
+# Rollup key used for orders that have no operator
+NO_OPERATOR_ID = 0
+
+
+def rollup_day(created_at: datetime) -> date:
+    """
+    UTC day an order is accounted under.
+
+    Naive datetimes are stored as UTC by the database driver, so they are
+    used as is; aware datetimes are converted to UTC first.
+    """
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(UTC)
+    return created_at.date()
+
+
+async def apply_order_delta(
+    db: AsyncSession,
+    order: Order,
+    order_count: int = 0,
+    cost: Decimal = Decimal("0"),
+    sale: Decimal = Decimal("0")
+) -> None:
+    """
+    Add a delta to the rollup row of the order's day and operator.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE so concurrent writers add their
+    deltas atomically. Does not commit.
+
+    Args:
+        db: Database session
+        order: Order the change belongs to (created_at must be set)
+        order_count: Change in number of orders (+1 on create, -1 on delete)
+        cost: Change in total cost price
+        sale: Change in total sale price
+    """
+    if not order_count and not cost and not sale:
+        return
+
+    table = OrderDailyStats.__table__
+    stmt = pg_insert(table).values(
+        day=rollup_day(order.created_at),
+        user_id=order.user_id or NO_OPERATOR_ID,
+        order_count=order_count,
+        total_cost=cost,
+        total_sale=sale,
+        total_profit=sale - cost,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.user_id],
+        set_={
+            column: table.c[column] + stmt.excluded[column]
+            for column in ("order_count", "total_cost", "total_sale", "total_profit")
+        },
+    )
+    await db.execute(stmt)
+
+
+async def rebuild_daily_stats(db: AsyncSession) -> int:
+    """
+    Recompute the whole rollup table from the orders table.
+
+    Used for backfilling and to repair drift. Runs in the caller's
+    transaction and commits at the end.
+
+    Safe to run while orders are being written: the table lock conflicts with
+    the lock apply_order_delta's upsert takes, so the rebuild waits for
+    writers that already touched the rollup to commit (and then counts their
+    orders), while writers that come later add their deltas on top of the
+    rebuilt rows.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of rollup rows written
+    """
+    day = cast(func.timezone("UTC", Order.created_at), Date)
+    user_id = func.coalesce(Order.user_id, NO_OPERATOR_ID)
+
+    source = (
+        select(
+            day,
+            user_id,
+            func.count(Order.id),
+            func.sum(Order.total_cost_price),
+            func.sum(Order.total_sale_price),
+            func.sum(Order.total_sale_price - Order.total_cost_price),
+        )
+        .group_by(day, user_id)
+    )
+
+    await db.execute(
+        text(f"LOCK TABLE {OrderDailyStats.__tablename__} IN SHARE ROW EXCLUSIVE MODE")
+    )
+    await db.execute(delete(OrderDailyStats))
+    result = await db.execute(
+        insert(OrderDailyStats).from_select(
+            ["day", "user_id", "order_count", "total_cost", "total_sale", "total_profit"],
+            source,
+        )
+    )
+    invalidate_on_commit(db)
+    await db.commit()
+    return result.rowcount
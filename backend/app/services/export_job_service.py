@@ -0,0 +1,247 @@
+"""
+Background export jobs.
+
+Large exports can take longer than a proxy allows for one HTTP request. A
+job runs the export in the background with its own database session; the
+client polls its progress and downloads the file once it is ready.
+
+Jobs live in the process (like the stats cache): with several uvicorn
+workers, polling and download must reach the worker that accepted the job.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, date, datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import freeze
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services import export_service
+from app.services.export_service import ExportFile, ExportProgress
+
+logger = logging.getLogger(__name__)
+
+
+async def _build_excel_file(db: AsyncSession, progress: ExportProgress, **filters: Any) -> ExportFile:
+    """Build an Excel export file for a job."""
+    return await export_service.build_orders_excel(db, progress=progress, **filters)
+
+
+async def _build_pdf_file(db: AsyncSession, progress: ExportProgress, **filters: Any) -> ExportFile:
+    """Build a PDF export file for a job."""
+    return await export_service.build_orders_pdf(db, progress=progress, **filters)
+
+
+# format -> (builder, file name prefix, extension, media type)
+JOB_FORMATS: dict[str, tuple[Callable[..., Awaitable[ExportFile]], str, str, str]] = {
+    "excel": (
+        _build_excel_file,
+        "orders_export",
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+    "pdf": (_build_pdf_file, "orders_report", "pdf", "application/pdf"),
+}
+
+
+class ExportJob:
+    """One background export and its progress."""
+
+    def __init__(self, format: str, filters: dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.format = format
+        self.filters = filters
+        self.status = "pending"  # pending, running, completed, failed
+        self.progress = ExportProgress()
+        self.error: Optional[str] = None
+        self.file: Optional[ExportFile] = None
+        self.created_at = datetime.now(UTC)
+        self.finished_at: Optional[datetime] = None
+        self.expires_at: Optional[datetime] = None
+
+    @property
+    def filename(self) -> str:
+        """Download file name."""
+        _, prefix, extension, _ = JOB_FORMATS[self.format]
+        return f"{prefix}_{self.created_at.strftime('%Y%m%d')}.{extension}"
+
+    @property
+    def media_type(self) -> str:
+        """Download media type."""
+        return JOB_FORMATS[self.format][3]
+
+
+class ExportJobManager:
+    """
+    Run export jobs with bounded concurrency and expire their files.
+
+    At most max_concurrency jobs render at once; the rest wait as pending.
+    Finished jobs (and their files) are dropped ttl seconds after they end.
+    Submitting the same format and filters while the data is unchanged
+    returns the existing job instead of starting a new one.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        max_concurrency: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.max_concurrency = max_concurrency or settings.EXPORT_JOB_MAX_CONCURRENCY
+        self.ttl = settings.EXPORT_JOB_TTL_SECONDS if ttl is None else ttl
+        self._jobs: dict[str, ExportJob] = {}
+        self._job_ids_by_key: dict[Any, str] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._purger: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        format: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[str] = None,
+        service_type: Optional[str] = None,
+    ) -> ExportJob:
+        """
+        Start an export job, or return the live job for the same request.
+
+        Args:
+            format: Export format (see JOB_FORMATS)
+            start_date: Only orders created on or after this date
+            end_date: Only orders created on or before this date
+            status: Only services with this status
+            service_type: Only services of this type
+
+        Returns:
+            The new or reused job
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        if format not in JOB_FORMATS:
+            raise ValueError(f"Invalid export format '{format}'. Must be one of: {', '.join(JOB_FORMATS)}")
+
+        filters = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "status": status,
+            "service_type": service_type,
+        }
+        # The database's data version makes a job stale as soon as the exported
+        # data changes, whoever wrote it (this process, a script, an admin tool)
+        async with self.session_factory() as db:
+            version = await export_service.export_data_version(db)
+        key = (format, version, freeze(filters))
+
+        self.purge_expired()
+
+        existing = self._jobs.get(self._job_ids_by_key.get(key, ""))
+        if existing is not None and existing.status != "failed":
+            return existing
+
+        job = ExportJob(format, filters)
+        self._jobs[job.id] = job
+        self._job_ids_by_key[key] = job.id
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Return a job by id, or None if unknown or expired."""
+        self.purge_expired()
+        return self._jobs.get(job_id)
+
+    def purge_expired(self) -> int:
+        """
+        Drop finished jobs past their expiry; their files are removed with them.
+
+        Returns:
+            Number of jobs dropped
+        """
+        now = datetime.now(UTC)
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.expires_at is not None and job.expires_at <= now
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._job_ids_by_key = {
+            key: job_id for key, job_id in self._job_ids_by_key.items() if job_id in self._jobs
+        }
+        return len(expired)
+
+    def start_purging(self, interval: Optional[float] = None) -> None:
+        """
+        Purge expired jobs periodically (on application startup).
+
+        Lookups and submissions purge too, but an idle worker would otherwise
+        keep finished jobs and their files forever.
+
+        Args:
+            interval: Seconds between purges (defaults to EXPORT_JOB_PURGE_INTERVAL_SECONDS)
+        """
+        if self._purger is None:
+            interval = settings.EXPORT_JOB_PURGE_INTERVAL_SECONDS if interval is None else interval
+            self._purger = asyncio.create_task(self._purge_periodically(interval))
+
+    async def _purge_periodically(self, interval: float) -> None:
+        """Run purge_expired every interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.purge_expired()
+
+    async def join(self) -> None:
+        """Wait until every submitted job has finished."""
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs and the periodic purge (on application shutdown)."""
+        tasks = set(self._tasks)
+        if self._purger is not None:
+            tasks.add(self._purger)
+            self._purger = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: ExportJob) -> None:
+        """Run one job once a concurrency slot is free."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        builder = JOB_FORMATS[job.format][0]
+        async with self._semaphore:
+            job.status = "running"
+            try:
+                async with self.session_factory() as db:
+                    job.progress.phase = "counting"
+                    job.progress.total_rows = await export_service.count_export_rows(db, **job.filters)
+                    job.file = await builder(db, job.progress, **job.filters)
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Export cancelled"
+                raise
+            except Exception:
+                # The exception text can include SQL and connection details:
+                # log it, and only report a generic message to clients
+                logger.exception("Export job %s failed", job.id)
+                job.status = "failed"
+                job.error = "Export failed"
+            else:
+                job.status = "completed"
+                job.progress.phase = "done"
+            finally:
+                job.finished_at = datetime.now(UTC)
+                job.expires_at = job.finished_at + timedelta(seconds=self.ttl)
+
+
+export_jobs = ExportJobManager()
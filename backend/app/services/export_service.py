@@ -1,12 +1,22 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import Optional
-from datetime import date, datetime
+from sqlalchemy import ColumnElement, Select, false, func, or_, select
+from sqlalchemy.orm import aliased
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import NamedTuple, Optional
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+import csv
 import io
+import json
+import os
+import pickle
+import tempfile
+import weakref
 
 # Excel libraries
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
@@ -15,11 +25,19 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, LongTable, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
+from app.core.coalesce import coalesced
+from app.core.config import settings
+from app.core.file_cache import FileCache, export_file_cache
+from app.core.workers import run_in_render_pool
+from app.db.session import AsyncSessionLocal
+from app.models.customer import Customer
+from app.models.deletion_counter import DeletionCounter
+from app.models.location import Location
 from app.models.order import Order
-from app.models.service import Service
+from app.models.service import Service, ServiceType
 
 
 def format_location(location) -> str:
@@ -33,57 +51,347 @@ def format_location(location) -> str:
     return ", ".join(parts)
 
 
-async def export_orders_to_excel(
-    db: AsyncSession,
+class ExportRow(NamedTuple):
+    """One exported service with its order and customer, as plain values."""
+
+    order_id: int
+    order_number: str
+    created_at: datetime
+    total_cost_price: Decimal
+    total_sale_price: Decimal
+    customer_name: str
+    document_id: Optional[str]
+    email: Optional[str]
+    phone_number: Optional[str]
+    service_type: str
+    service_name: str
+    departure_datetime: Optional[datetime]
+    arrival_datetime: Optional[datetime]
+    origin: str
+    destination: str
+    status: str
+    service_id: Optional[int] = None
+    updated_at: Optional[datetime] = None  # latest change to the order or the service
+
+    @property
+    def total_profit(self) -> Decimal:
+        """Order profit as sale_price - cost_price."""
+        return self.total_sale_price - self.total_cost_price
+
+
+def _location_label(location) -> ColumnElement:
+    """SQL equivalent of format_location (empty string when there is no location)."""
+    return func.concat_ws(", ", location.city, func.nullif(location.state, ""), location.country)
+
+
+def build_export_query(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[str] = None,
-    service_type: Optional[str] = None
-) -> bytes:
+    service_type: Optional[str] = None,
+    since: Optional[datetime] = None
+) -> Select:
     """
-    Export orders to Excel format with optional filters.
-    Filters by order creation date (sale date), not by flight departure date.
+    Build the query shared by every export format.
+
+    Returns one row per service (see ExportRow) with its order, customer and
+    formatted locations. Date filters apply to the order creation date (sale
+    date), not the flight departure date; status and service_type filter the
+    services in SQL, so only matching rows are fetched. With since, only
+    services changed after it, or belonging to an order changed after it,
+    are returned.
     """
-    # Build query with eager loading
-    query = select(Order).options(
-        selectinload(Order.services).selectinload(Service.origin_location),
-        selectinload(Order.services).selectinload(Service.destination_location),
-        selectinload(Order.customer),
-        selectinload(Order.user)
+    origin = aliased(Location)
+    destination = aliased(Location)
+
+    query = (
+        select(
+            Order.id.label("order_id"),
+            Order.order_number,
+            Order.created_at,
+            Order.total_cost_price,
+            Order.total_sale_price,
+            Customer.full_name.label("customer_name"),
+            Customer.document_id,
+            Customer.email,
+            Customer.phone_number,
+            Service.service_type,
+            Service.name.label("service_name"),
+            Service.departure_datetime,
+            Service.arrival_datetime,
+            _location_label(origin).label("origin"),
+            _location_label(destination).label("destination"),
+            Service.status,
+            Service.id.label("service_id"),
+            func.greatest(Order.updated_at, Service.updated_at).label("updated_at"),
+        )
+        .select_from(Service)
+        .join(Order, Service.order_id == Order.id)
+        .join(Customer, Order.customer_id == Customer.id)
+        .outerjoin(origin, Service.origin_location_id == origin.id)
+        .outerjoin(destination, Service.destination_location_id == destination.id)
+        .order_by(Order.created_at, Order.id, Service.id)
     )
 
-    # Apply filters to Order created_at (sale date), not flight departure date
     if start_date:
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        query = query.where(Order.created_at >= start_datetime)
+        query = query.where(Order.created_at >= datetime.combine(start_date, datetime.min.time()))
     if end_date:
-        end_datetime = datetime.combine(end_date, datetime.max.time())
-        query = query.where(Order.created_at <= end_datetime)
+        query = query.where(Order.created_at <= datetime.combine(end_date, datetime.max.time()))
+    if status:
+        query = query.where(Service.status == status.lower())
+    if service_type:
+        try:
+            query = query.where(Service.service_type == ServiceType(service_type.upper()))
+        except ValueError:
+            # Unknown service type: nothing matches
+            query = query.where(false())
+    if since is not None:
+        # Two indexed lookups on services (updated_at, order_id) instead of
+        # an OR across the join, which would scan every service
+        changed_orders = select(Order.id).where(Order.updated_at > since)
+        query = query.where(or_(Service.updated_at > since, Service.order_id.in_(changed_orders)))
+
+    return query
+
+
+def _to_export_row(row) -> ExportRow:
+    """Convert a result row of build_export_query into an ExportRow (matched by column label)."""
+    values = dict(row._mapping)
+    service_type = values["service_type"]
+    values["service_type"] = service_type.value if hasattr(service_type, "value") else str(service_type)
+    return ExportRow(**values)
+
 
-    # Execute query first to get orders
+async def count_export_rows(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None
+) -> int:
+    """Count the rows matching the export filters."""
+    query = build_export_query(start_date, end_date, status, service_type)
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar_one()
+
+
+class ExportDelta(NamedTuple):
+    """Rows changed since a cursor, and the cursor to pass next time."""
+
+    rows: list[ExportRow]
+    next_cursor: Optional[datetime]
+
+
+async def fetch_export_delta(
+    db: AsyncSession,
+    since: Optional[datetime] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None
+) -> ExportDelta:
+    """
+    Fetch the rows created or changed after a cursor (incremental sync).
+
+    The cursor is a modification timestamp: pass the returned next_cursor
+    as since on the following call. It never advances past
+    EXPORT_DELTA_LAG_SECONDS ago, so a change whose transaction commits
+    late is still picked up; rows changed within that window may be
+    returned twice, so consumers should upsert by service_id.
+    Deleted orders and services are not reported.
+
+    Args:
+        db: Database session
+        since: Only rows changed after this time (None for the full history)
+        start_date: Only orders created on or after this date
+        end_date: Only orders created on or before this date
+        status: Only services with this status
+        service_type: Only services of this type
+
+    Returns:
+        The changed rows and the next cursor
+    """
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+
+    query = build_export_query(start_date, end_date, status, service_type, since)
     result = await db.execute(query)
-    orders = result.scalars().unique().all()
-
-    # Filter services within orders if needed
-    if status or service_type:
-        filtered_orders = []
-        for order in orders:
-            filtered_services = order.services
-            if status:
-                filtered_services = [s for s in filtered_services if s.status == status.lower()]
-            if service_type:
-                filtered_services = [s for s in filtered_services if s.service_type.value == service_type.upper()]
-
-            if filtered_services:
-                # Create a copy with filtered services
-                order.services = filtered_services
-                filtered_orders.append(order)
-        orders = filtered_orders
-
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Orders Export"
+    rows = [_to_export_row(row) for row in result.all()]
+
+    if not rows:
+        return ExportDelta(rows, since)
+
+    horizon = datetime.now(UTC) - timedelta(seconds=settings.EXPORT_DELTA_LAG_SECONDS)
+    next_cursor = min(max(row.updated_at for row in rows), horizon)
+    if since is not None:
+        next_cursor = max(next_cursor, since)
+    return ExportDelta(rows, next_cursor)
+
+
+class ExportProgress:
+    """Progress of one export, updated while it runs (used by export jobs)."""
+
+    def __init__(self):
+        self.phase = "queued"
+        self.rows_processed = 0
+        self.total_rows: Optional[int] = None
+
+
+# (header, ExportRow field or None for the computed profit, fixed width for dates)
+EXCEL_COLUMNS = [
+    ("Order Number", "order_number", None),
+    ("Customer Name", "customer_name", None),
+    ("Document", "document_id", None),
+    ("Email", "email", None),
+    ("Phone", "phone_number", None),
+    ("Service Type", "service_type", None),
+    ("Service Name", "service_name", None),
+    ("Departure", "departure_datetime", 16),
+    ("Arrival", "arrival_datetime", 16),
+    ("Origin", "origin", None),
+    ("Destination", "destination", None),
+    ("Status", "status", None),
+    ("Cost Price", "total_cost_price", None),
+    ("Sale Price", "total_sale_price", None),
+    ("Profit", None, None),
+    ("Created At", "created_at", 16),
+]
+EXCEL_MAX_COLUMN_WIDTH = 50
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class ExportFile:
+    """
+    A rendered export stored in a temporary file.
+
+    The file is removed once the last reference to this object is gone, so
+    concurrent downloads (e.g. of the same export job) can all stream it.
+    """
+
+    def __init__(self, suffix: str):
+        fd, self.path = tempfile.mkstemp(prefix="export-", suffix=suffix)
+        os.close(fd)
+        self._finalizer = weakref.finalize(self, _remove_file, self.path)
+
+    @property
+    def size(self) -> int:
+        """File size in bytes."""
+        return os.path.getsize(self.path)
+
+    def iter_chunks(self, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the file contents in chunks (keeps the file alive while iterating)."""
+        with open(self.path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def read_bytes(self) -> bytes:
+        """Read the whole file."""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+
+def _remove_file(path: str) -> None:
+    """Delete a temporary export file if it still exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# Fields whose longest value sets their column width (None: the computed profit)
+EXCEL_MEASURED_FIELDS = [field for _, field, fixed_width in EXCEL_COLUMNS if not fixed_width]
+
+
+def _measure_excel_row(lengths: list[int], row: ExportRow) -> None:
+    """Raise lengths (in EXCEL_MEASURED_FIELDS order) to the text length of the row's values."""
+    for index, field in enumerate(EXCEL_MEASURED_FIELDS):
+        value = getattr(row, field) if field else row.total_profit
+        if value is not None:
+            lengths[index] = max(lengths[index], len(str(value)))
+
+
+def _excel_widths(lengths: list[int]) -> list[int]:
+    """
+    Excel column widths from the longest value measured per column.
+
+    Write-only worksheets emit column widths before the first row, so the
+    lengths are measured while the rows are spooled, before rendering.
+    """
+    measured = iter(lengths)
+    widths = []
+    for header, _, fixed_width in EXCEL_COLUMNS:
+        length = fixed_width or next(measured)
+        widths.append(min(max(len(header), length) + 2, EXCEL_MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _excel_row_values(row: ExportRow) -> list:
+    """Cell values of one export row, in EXCEL_COLUMNS order."""
+    return [
+        row.order_number,
+        row.customer_name,
+        row.document_id or "",
+        row.email or "",
+        row.phone_number or "",
+        row.service_type,
+        row.service_name,
+        row.departure_datetime.strftime("%Y-%m-%d %H:%M") if row.departure_datetime else "",
+        row.arrival_datetime.strftime("%Y-%m-%d %H:%M") if row.arrival_datetime else "",
+        row.origin,
+        row.destination,
+        row.status,
+        float(row.total_cost_price),
+        float(row.total_sale_price),
+        float(row.total_profit),
+        row.created_at.strftime("%Y-%m-%d %H:%M"),
+    ]
+
+
+async def _spool_export_rows(
+    db: AsyncSession,
+    query: Select,
+    progress: Optional[ExportProgress] = None,
+    excel_lengths: Optional[list[int]] = None
+) -> ExportFile:
+    """
+    Stream the export rows into a spool file of pickled batches.
+
+    Rows are read through a server-side cursor in batches of
+    EXPORT_BATCH_SIZE and written as plain tuples, so a renderer running in
+    another thread or process can read them back without holding the whole
+    result set in memory. When excel_lengths is given, the longest value of
+    each Excel column is measured in the same pass (see _measure_excel_row).
+    """
+    spool = ExportFile(".spool")
+    result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    with open(spool.path, "wb") as f:
+        async for partition in result.partitions():
+            rows = [_to_export_row(row) for row in partition]
+            if excel_lengths is not None:
+                for row in rows:
+                    _measure_excel_row(excel_lengths, row)
+            pickle.dump([tuple(row) for row in rows], f, pickle.HIGHEST_PROTOCOL)
+            if progress:
+                progress.rows_processed += len(partition)
+    return spool
+
+
+def _read_spool(path: str) -> Iterator[ExportRow]:
+    """Yield the rows written by _spool_export_rows."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            for values in batch:
+                yield ExportRow._make(values)
+
+
+def _render_excel(spool_path: str, output_path: str, widths: list[int]) -> None:
+    """Write the spooled rows to a write-only workbook (runs in the render pool)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Orders Export")
 
     # Define styles
     header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
@@ -97,231 +405,629 @@ async def export_orders_to_excel(
         bottom=Side(style='thin')
     )
 
-    # Headers
-    headers = [
-        "Order Number", "Customer Name", "Document", "Email", "Phone",
-        "Service Type", "Service Name", "Departure", "Arrival", "Origin", "Destination",
-        "Status", "Cost Price", "Sale Price", "Profit", "Created At"
-    ]
+    # Column widths must be set before the first row is written
+    for col_num, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = width
 
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num)
-        cell.value = header
+    # Headers
+    header_cells = []
+    for header, _, _ in EXCEL_COLUMNS:
+        cell = WriteOnlyCell(ws, value=header)
         cell.fill = header_fill
         cell.font = header_font
         cell.alignment = header_alignment
         cell.border = border_style
+        header_cells.append(cell)
+    ws.append(header_cells)
 
     # Data rows
-    row_num = 2
-    for order in orders:
-        for service in order.services:
-            ws.cell(row=row_num, column=1, value=order.order_number)
-            ws.cell(row=row_num, column=2, value=order.customer.full_name)
-            ws.cell(row=row_num, column=3, value=order.customer.document_id or "")
-            ws.cell(row=row_num, column=4, value=order.customer.email or "")
-            ws.cell(row=row_num, column=5, value=order.customer.phone_number or "")
-            ws.cell(row=row_num, column=6, value=service.service_type.value if hasattr(service.service_type, 'value') else str(service.service_type))
-            ws.cell(row=row_num, column=7, value=service.name)
-            ws.cell(row=row_num, column=8, value=service.departure_datetime.strftime("%Y-%m-%d %H:%M") if service.departure_datetime else "")
-            ws.cell(row=row_num, column=9, value=service.arrival_datetime.strftime("%Y-%m-%d %H:%M") if service.arrival_datetime else "")
-            ws.cell(row=row_num, column=10, value=format_location(service.origin_location))
-            ws.cell(row=row_num, column=11, value=format_location(service.destination_location))
-            ws.cell(row=row_num, column=12, value=service.status)
-            ws.cell(row=row_num, column=13, value=float(order.total_cost_price))
-            ws.cell(row=row_num, column=14, value=float(order.total_sale_price))
-            ws.cell(row=row_num, column=15, value=float(order.total_profit))
-            ws.cell(row=row_num, column=16, value=order.created_at.strftime("%Y-%m-%d %H:%M"))
-
-            # Apply borders
-            for col in range(1, len(headers) + 1):
-                ws.cell(row=row_num, column=col).border = border_style
-
-            row_num += 1
-
-    # Adjust column widths
-    for col_num in range(1, len(headers) + 1):
-        column_letter = get_column_letter(col_num)
-        max_length = 0
-        for cell in ws[column_letter]:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-
-    # Save to bytes
-    excel_file = io.BytesIO()
-    wb.save(excel_file)
-    excel_file.seek(0)
-
-    return excel_file.getvalue()
-
-
-async def export_orders_to_pdf(
+    for row in _read_spool(spool_path):
+        cells = []
+        for value in _excel_row_values(row):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.border = border_style
+            cells.append(cell)
+        ws.append(cells)
+
+    wb.save(output_path)
+
+
+async def build_orders_excel(
     db: AsyncSession,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[str] = None,
-    service_type: Optional[str] = None
-) -> bytes:
+    service_type: Optional[str] = None,
+    progress: Optional[ExportProgress] = None
+) -> ExportFile:
     """
-    Export orders to PDF format with optional filters.
-    Filters by order creation date (sale date), not by flight departure date.
+    Build the Excel export into a temporary file.
+
+    Rows are streamed from the database into a spool file, then the workbook
+    is rendered in write-only mode in the render pool, so neither the result
+    set nor the workbook is held in memory and the event loop stays free.
+
+    Args:
+        db: Database session
+        start_date: Only orders created on or after this date
+        end_date: Only orders created on or before this date
+        status: Only services with this status
+        service_type: Only services of this type
+        progress: Updated with the phase and rows processed
+
+    Returns:
+        ExportFile with the .xlsx contents
     """
-    # Build query with eager loading
-    query = select(Order).options(
-        selectinload(Order.services).selectinload(Service.origin_location),
-        selectinload(Order.services).selectinload(Service.destination_location),
-        selectinload(Order.customer),
-        selectinload(Order.user)
-    )
+    progress = progress or ExportProgress()
+    query = build_export_query(start_date, end_date, status, service_type)
 
-    # Apply filters to Order created_at (sale date), not flight departure date
-    if start_date:
-        start_datetime = datetime.combine(start_date, datetime.min.time())
-        query = query.where(Order.created_at >= start_datetime)
-    if end_date:
-        end_datetime = datetime.combine(end_date, datetime.max.time())
-        query = query.where(Order.created_at <= end_datetime)
+    progress.phase = "fetching"
+    lengths = [0] * len(EXCEL_MEASURED_FIELDS)
+    spool = await _spool_export_rows(db, query, progress, excel_lengths=lengths)
+    widths = _excel_widths(lengths)
 
-    # Execute query first to get orders
-    result = await db.execute(query)
-    orders = result.scalars().unique().all()
-
-    # Filter services within orders if needed
-    if status or service_type:
-        filtered_orders = []
-        for order in orders:
-            filtered_services = order.services
-            if status:
-                filtered_services = [s for s in filtered_services if s.status == status.lower()]
-            if service_type:
-                filtered_services = [s for s in filtered_services if s.service_type.value == service_type.upper()]
-
-            if filtered_services:
-                # Create a copy with filtered services
-                order.services = filtered_services
-                filtered_orders.append(order)
-        orders = filtered_orders
-
-    # Create PDF
-    pdf_file = io.BytesIO()
-    doc = SimpleDocTemplate(pdf_file, pagesize=A4)
-    elements = []
-
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#4472C4'),
-        alignment=TA_CENTER,
-        spaceAfter=30
+    progress.phase = "rendering"
+    export_file = ExportFile(".xlsx")
+    await run_in_render_pool(_render_excel, spool.path, export_file.path, widths)
+    return export_file
+
+
+class ExportSummary(NamedTuple):
+    """Order count and totals of an export, each order counted once."""
+
+    order_count: int
+    total_cost: Decimal
+    total_sale: Decimal
+
+
+async def _export_summary(db: AsyncSession, query: Select) -> ExportSummary:
+    """
+    Compute the report totals in SQL.
+
+    Order totals are repeated on every service row, so they are summed over
+    the distinct orders of the export.
+    """
+    rows = query.order_by(None).subquery()
+    orders = (
+        select(rows.c.order_id, rows.c.total_cost_price, rows.c.total_sale_price)
+        .distinct()
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(orders.c.total_cost_price), 0),
+            func.coalesce(func.sum(orders.c.total_sale_price), 0),
+        )
     )
+    return ExportSummary._make(result.one())
+
+
+# PDF styles are built once and shared by every report and table chunk
+PDF_STYLES = getSampleStyleSheet()
+PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=PDF_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#4472C4'),
+    alignment=TA_CENTER,
+    spaceAfter=30
+)
+PDF_SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+PDF_ORDERS_HEADER = ['Order #', 'Customer', 'Service', 'Date', 'Status', 'Cost', 'Sale', 'Profit']
+PDF_ORDERS_COL_WIDTHS = [0.8*inch, 1.3*inch, 0.8*inch, 0.9*inch, 0.8*inch, 0.7*inch, 0.7*inch, 0.7*inch]
+PDF_ORDERS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+PDF_TOTALS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#E7E6E6')),
+    ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+class _FlowableStream(list):
+    """
+    Flowable list that refills itself from an iterator while it is consumed.
+
+    SimpleDocTemplate.build() lays out flowables from the front of the list
+    for as long as len() is non-zero, so handing it this list keeps only the
+    flowable being laid out in memory instead of the whole report.
+    """
 
-    # Title
-    elements.append(Paragraph("Travel Sales Report", title_style))
-    elements.append(Spacer(1, 0.3*inch))
+    def __init__(self, flowables: Iterator):
+        super().__init__()
+        self._source = flowables
 
-    # Summary section
-    summary_data = [
-        ['Report Information', ''],
-        ['Generated:', datetime.now().strftime("%Y-%m-%d %H:%M")],
-        ['Total Orders:', str(len(orders))],
+    def __len__(self) -> int:
+        if not super().__len__():
+            flowable = next(self._source, None)
+            if flowable is not None:
+                self.append(flowable)
+        return super().__len__()
+
+
+def _pdf_row_values(row: ExportRow) -> list[str]:
+    """Cell values of one row of the orders table."""
+    return [
+        str(row.order_number)[:10],
+        row.customer_name[:20],
+        row.service_type,
+        row.departure_datetime.strftime("%Y-%m-%d") if row.departure_datetime else "",
+        row.status,
+        f"${float(row.total_cost_price):.2f}",
+        f"${float(row.total_sale_price):.2f}",
+        f"${float(row.total_profit):.2f}"
     ]
 
-    if start_date:
-        summary_data.append(['Start Date:', start_date.strftime("%Y-%m-%d")])
-    if end_date:
-        summary_data.append(['End Date:', end_date.strftime("%Y-%m-%d")])
-    if status:
-        summary_data.append(['Status Filter:', status])
-    if service_type:
-        summary_data.append(['Service Type:', service_type])
-
-    summary_table = Table(summary_data, colWidths=[2*inch, 3*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-
-    elements.append(summary_table)
-    elements.append(Spacer(1, 0.5*inch))
-
-    # Orders table
-    if orders:
-        # Table header
-        data = [['Order #', 'Customer', 'Service', 'Date', 'Status', 'Cost', 'Sale', 'Profit']]
-
-        # Table rows
-        for order in orders:
-            for service in order.services:
-                service_type = service.service_type.value if hasattr(service.service_type, 'value') else str(service.service_type)
-                data.append([
-                    str(order.order_number)[:10],
-                    order.customer.full_name[:20],
-                    service_type,
-                    service.departure_datetime.strftime("%Y-%m-%d") if service.departure_datetime else "",
-                    service.status,
-                    f"${float(order.total_cost_price):.2f}",
-                    f"${float(order.total_sale_price):.2f}",
-                    f"${float(order.total_profit):.2f}"
-                ])
-
-        # Create table
-        orders_table = Table(data, colWidths=[0.8*inch, 1.3*inch, 0.8*inch, 0.9*inch, 0.8*inch, 0.7*inch, 0.7*inch, 0.7*inch])
-        orders_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-        ]))
-
-        elements.append(Paragraph("Orders Details", styles['Heading2']))
-        elements.append(Spacer(1, 0.2*inch))
-        elements.append(orders_table)
-
-        # Calculate totals
-        total_cost = sum(float(order.total_cost_price) for order in orders)
-        total_sale = sum(float(order.total_sale_price) for order in orders)
-        total_profit = sum(float(order.total_profit) for order in orders)
-
-        elements.append(Spacer(1, 0.3*inch))
 
+def _iter_orders_tables(spool_path: str, chunk_rows: int) -> Iterator[LongTable]:
+    """Yield the orders table as LongTables of chunk_rows rows, each with its header."""
+    chunk = []
+    for row in _read_spool(spool_path):
+        chunk.append(_pdf_row_values(row))
+        if len(chunk) == chunk_rows:
+            yield LongTable([PDF_ORDERS_HEADER, *chunk], colWidths=PDF_ORDERS_COL_WIDTHS, repeatRows=1, style=PDF_ORDERS_TABLE_STYLE)
+            chunk = []
+    if chunk:
+        yield LongTable([PDF_ORDERS_HEADER, *chunk], colWidths=PDF_ORDERS_COL_WIDTHS, repeatRows=1, style=PDF_ORDERS_TABLE_STYLE)
+
+
+def _render_pdf(
+    spool_path: str,
+    output_path: str,
+    summary: tuple,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    status: Optional[str],
+    service_type: Optional[str],
+    chunk_rows: int
+) -> None:
+    """Write the PDF report from the spooled rows (runs in the render pool)."""
+    summary = ExportSummary._make(summary)
+    doc = SimpleDocTemplate(output_path, pagesize=A4)
+
+    def flowables():
+        # Title
+        yield Paragraph("Travel Sales Report", PDF_TITLE_STYLE)
+        yield Spacer(1, 0.3*inch)
+
+        # Summary section
+        summary_data = [
+            ['Report Information', ''],
+            ['Generated:', datetime.now().strftime("%Y-%m-%d %H:%M")],
+            ['Total Orders:', str(summary.order_count)],
+        ]
+
+        if start_date:
+            summary_data.append(['Start Date:', start_date.strftime("%Y-%m-%d")])
+        if end_date:
+            summary_data.append(['End Date:', end_date.strftime("%Y-%m-%d")])
+        if status:
+            summary_data.append(['Status Filter:', status])
+        if service_type:
+            summary_data.append(['Service Type:', service_type])
+
+        yield Table(summary_data, colWidths=[2*inch, 3*inch], style=PDF_SUMMARY_TABLE_STYLE)
+        yield Spacer(1, 0.5*inch)
+
+        # Orders table
+        if not summary.order_count:
+            yield Paragraph("No orders found matching the criteria.", PDF_STYLES['Normal'])
+            return
+
+        yield Paragraph("Orders Details", PDF_STYLES['Heading2'])
+        yield Spacer(1, 0.2*inch)
+        yield from _iter_orders_tables(spool_path, chunk_rows)
+
+        # Totals
+        yield Spacer(1, 0.3*inch)
         totals_data = [
-            ['Total Cost Price:', f"${total_cost:.2f}"],
-            ['Total Sale Price:', f"${total_sale:.2f}"],
-            ['Total Profit:', f"${total_profit:.2f}"]
+            ['Total Cost Price:', f"${float(summary.total_cost):.2f}"],
+            ['Total Sale Price:', f"${float(summary.total_sale):.2f}"],
+            ['Total Profit:', f"${float(summary.total_sale - summary.total_cost):.2f}"]
         ]
+        yield Table(totals_data, colWidths=[2*inch, 2*inch], style=PDF_TOTALS_TABLE_STYLE)
+
+    # Build PDF, laying out the table chunks as they are produced
+    doc.build(_FlowableStream(flowables()))
+
+
+async def build_orders_pdf(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None,
+    progress: Optional[ExportProgress] = None
+) -> ExportFile:
+    """
+    Build the PDF report into a temporary file.
+
+    Rows are streamed into a spool file and totals are computed in SQL. The
+    document is then built in the render pool, one chunk of
+    EXPORT_PDF_TABLE_ROWS rows at a time, so memory does not grow with the
+    number of rows and reportlab does not block the event loop.
+
+    Args:
+        db: Database session
+        start_date: Only orders created on or after this date
+        end_date: Only orders created on or before this date
+        status: Only services with this status
+        service_type: Only services of this type
+        progress: Updated with the phase and rows processed
+
+    Returns:
+        ExportFile with the PDF contents
+    """
+    progress = progress or ExportProgress()
+    query = build_export_query(start_date, end_date, status, service_type)
+    summary = await _export_summary(db, query)
+
+    progress.phase = "fetching"
+    spool = await _spool_export_rows(db, query, progress)
+
+    progress.phase = "rendering"
+    export_file = ExportFile(".pdf")
+    await run_in_render_pool(
+        _render_pdf, spool.path, export_file.path, tuple(summary),
+        start_date, end_date, status, service_type, settings.EXPORT_PDF_TABLE_ROWS
+    )
+    return export_file
+
+
+# format -> (builder, file extension) of the exports served from the file cache
+CACHED_EXPORT_FORMATS = {
+    "excel": (build_orders_excel, ".xlsx"),
+    "pdf": (build_orders_pdf, ".pdf"),
+}
+
+
+async def export_data_version(db: AsyncSession) -> str:
+    """
+    Version of the exported data, derived from the latest modification of every
+    exported table: orders, services, and the customers and locations whose
+    names and contact details appear in the files.
+
+    Each max(updated_at) is an index lookup. Deletions leave no updated_at
+    behind, so the counter bumped by the deletion triggers is included too.
+    """
+    result = await db.execute(
+        select(
+            *(
+                select(func.max(model.updated_at)).scalar_subquery()
+                for model in (Order, Service, Customer, Location)
+            ),
+            select(DeletionCounter.deletions).where(DeletionCounter.id == 1).scalar_subquery(),
+        )
+    )
+    return "|".join(str(value) for value in result.one())
+
+
+async def export_cache_key(
+    db: AsyncSession,
+    format: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None
+) -> tuple:
+    """
+    Cache key of an export: format, filters and the current data version.
+
+    Raises:
+        ValueError: If the format is not served from the cache
+    """
+    if format not in CACHED_EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format '{format}'. Must be one of: {', '.join(CACHED_EXPORT_FORMATS)}")
+    version = await export_data_version(db)
+    return (format, version, start_date, end_date, status, service_type)
+
+
+def export_etag(key: tuple, cache: FileCache = export_file_cache) -> str:
+    """ETag of the export with the given cache key."""
+    return f'"{cache.key_digest(key)}"'
+
+
+async def get_cached_export(db: AsyncSession, key: tuple, cache: FileCache = export_file_cache) -> Path:
+    """
+    Return the cached file for an export key, building it on a miss.
+
+    Args:
+        db: Database session
+        key: Key from export_cache_key
+        cache: File cache to use
+
+    Returns:
+        Path of the export file in the cache
+    """
+    _, suffix = CACHED_EXPORT_FORMATS[key[0]]
+    path = cache.get(key, suffix)
+    if path is None:
+        path = await _build_cached_export(db, key, cache)
+    return path
+
+
+@coalesced("exports-cached")
+async def _build_cached_export(db: AsyncSession, key: tuple, cache: FileCache) -> Path:
+    """Build an export and move it into the cache (once per key at a time)."""
+    format, _, start_date, end_date, status, service_type = key
+    builder, suffix = CACHED_EXPORT_FORMATS[format]
+    export_file = await builder(db, start_date, end_date, status, service_type)
+    return cache.put(key, suffix, export_file.path)
+
+
+# Columns of the CSV and NDJSON exports: every ExportRow field plus the profit
+FLAT_EXPORT_COLUMNS = ExportRow._fields + ("total_profit",)
+
+
+async def stream_export_rows(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+) -> AsyncIterator[list[ExportRow]]:
+    """
+    Yield the rows matching the export filters in batches from a server-side cursor.
+
+    Opens its own session: a StreamingResponse body runs after the request's
+    dependencies (and their session) have been closed.
+    """
+    query = build_export_query(start_date, end_date, status, service_type)
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield [_to_export_row(row) for row in partition]
+
+
+def _flat_values(row: ExportRow) -> list:
+    """Row values in FLAT_EXPORT_COLUMNS order: money as exact decimals, timestamps as ISO 8601."""
+    values = []
+    for value in (*row, row.total_profit):
+        if isinstance(value, Decimal):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        values.append(value)
+    return values
+
+
+async def iter_orders_csv(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+) -> AsyncIterator[str]:
+    """
+    Stream the export as CSV, one chunk per database batch.
+
+    Memory use is bounded by EXPORT_BATCH_SIZE regardless of the export size.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FLAT_EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    async for batch in stream_export_rows(start_date, end_date, status, service_type, session_factory):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_flat_values(row) for row in batch)
+        yield buffer.getvalue()
+
+
+async def iter_orders_ndjson(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+) -> AsyncIterator[str]:
+    """
+    Stream the export as newline-delimited JSON (one object per service row).
+
+    Memory use is bounded by EXPORT_BATCH_SIZE regardless of the export size.
+    """
+    async for batch in stream_export_rows(start_date, end_date, status, service_type, session_factory):
+        yield "".join(
+            json.dumps(dict(zip(FLAT_EXPORT_COLUMNS, _flat_values(row), strict=True)), ensure_ascii=False) + "\n"
+            for row in batch
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only sink that hands what was written back in chunks (for pyarrow writers)."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
 
-        totals_table = Table(totals_data, colWidths=[2*inch, 2*inch])
-        totals_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#E7E6E6')),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-
-        elements.append(totals_table)
-    else:
-        elements.append(Paragraph("No orders found matching the criteria.", styles['Normal']))
-
-    # Build PDF
-    doc.build(elements)
-    pdf_file.seek(0)
-
-    return pdf_file.getvalue()
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Return and forget everything written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_export_schema():
+    """
+    Arrow schema of the columnar exports (same columns as the CSV export).
+
+    Money is decimal and timestamps are timezone-aware (UTC).
+    """
+    import pyarrow as pa
+
+    money = pa.decimal128(10, 2)
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("order_id", pa.int64()),
+        ("order_number", pa.string()),
+        ("created_at", timestamp),
+        ("total_cost_price", money),
+        ("total_sale_price", money),
+        ("customer_name", pa.string()),
+        ("document_id", pa.string()),
+        ("email", pa.string()),
+        ("phone_number", pa.string()),
+        ("service_type", pa.string()),
+        ("service_name", pa.string()),
+        ("departure_datetime", timestamp),
+        ("arrival_datetime", timestamp),
+        ("origin", pa.string()),
+        ("destination", pa.string()),
+        ("status", pa.string()),
+        ("service_id", pa.int64()),
+        ("updated_at", timestamp),
+        ("total_profit", pa.decimal128(11, 2)),
+    ])
+
+
+def _arrow_record_batch(schema, rows: list[ExportRow]):
+    """Convert export rows into one Arrow record batch."""
+    import pyarrow as pa
+
+    columns = zip(*((*row, row.total_profit) for row in rows), strict=True)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema, strict=True)],
+        schema=schema
+    )
+
+
+async def _iter_arrow_format(
+    open_writer: Callable,
+    rows_per_write: int,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    status: Optional[str],
+    service_type: Optional[str],
+    session_factory: Callable[[], AsyncSession]
+) -> AsyncIterator[bytes]:
+    """
+    Stream an export through a pyarrow writer.
+
+    Rows from the cursor are grouped into record batches of rows_per_write
+    and written one at a time; whatever the writer produced is yielded
+    right away, so at most one batch is held in memory.
+    """
+    schema = _arrow_export_schema()
+    sink = _ChunkSink()
+    writer = open_writer(sink, schema)
+
+    pending: list[ExportRow] = []
+    async for batch in stream_export_rows(start_date, end_date, status, service_type, session_factory):
+        pending.extend(batch)
+        while len(pending) >= rows_per_write:
+            writer.write_batch(_arrow_record_batch(schema, pending[:rows_per_write]))
+            del pending[:rows_per_write]
+            yield sink.drain()
+
+    if pending:
+        writer.write_batch(_arrow_record_batch(schema, pending))
+    writer.close()
+    yield sink.drain()
+
+
+def iter_orders_parquet(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    row_group_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream the export as a Parquet file, one row group at a time.
+
+    Args:
+        start_date: Only orders created on or after this date
+        end_date: Only orders created on or before this date
+        status: Only services with this status
+        service_type: Only services of this type
+        session_factory: Factory opening the session used by the stream
+        row_group_size: Rows per row group (defaults to EXPORT_ROW_GROUP_SIZE)
+
+    Returns:
+        Async iterator of file chunks
+
+    Raises:
+        ImportError: If pyarrow is not installed (checked before streaming starts)
+    """
+    import pyarrow.parquet as pq
+
+    def open_writer(sink, schema):
+        return pq.ParquetWriter(sink, schema)
+
+    return _iter_arrow_format(
+        open_writer, row_group_size or settings.EXPORT_ROW_GROUP_SIZE,
+        start_date, end_date, status, service_type, session_factory
+    )
+
+
+def iter_orders_arrow(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = None,
+    service_type: Optional[str] = None,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    batch_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream the export as an Arrow IPC file (Feather v2), one record batch at a time.
+
+    Args:
+        start_date: Only orders created on or after this date
+        end_date: Only orders created on or before this date
+        status: Only services with this status
+        service_type: Only services of this type
+        session_factory: Factory opening the session used by the stream
+        batch_size: Rows per record batch (defaults to EXPORT_ROW_GROUP_SIZE)
+
+    Returns:
+        Async iterator of file chunks
+
+    Raises:
+        ImportError: If pyarrow is not installed (checked before streaming starts)
+    """
+    import pyarrow as pa
+
+    def open_writer(sink, schema):
+        return pa.ipc.new_file(sink, schema)
+
+    return _iter_arrow_format(
+        open_writer, batch_size or settings.EXPORT_ROW_GROUP_SIZE,
+        start_date, end_date, status, service_type, session_factory
+    )
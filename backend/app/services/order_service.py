@@ -1,13 +1,22 @@
-"""Order and service management with transactional logic."""
+"""
+Order and service management with transactional logic.
 
-import secrets
+Mutations only flush: the caller owns the transaction and commits once (for
+API requests, the get_db dependency at the end of the request). Stats cache
+invalidation is deferred until that commit.
+"""
+
+from collections import Counter
 from datetime import datetime, timedelta
 from decimal import Decimal
 
-from sqlalchemy import select, delete, func
+from sqlalchemy import and_, insert, select, delete, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache import invalidate_on_commit
 from app.models.customer import Customer
 from app.models.order import Order
 from app.models.service import Service, ServiceType
@@ -16,88 +25,293 @@ from app.models.user import User
 from app.models.popular_trip import PopularTrip
 from app.schemas import order as order_schemas
 from app.schemas import service as service_schemas
+from app.services import daily_stats_service
+
+
+async def apply_order_totals_delta(
+    db: AsyncSession,
+    order: Order,
+    cost: Decimal = Decimal("0"),
+    sale: Decimal = Decimal("0")
+) -> None:
+    """
+    Add the price change of one service to its order's totals.
+
+    The totals are updated with a single UPDATE ... SET total = total + delta
+    RETURNING statement instead of re-reading every service of the order, so
+    the cost does not grow with the number of services, and concurrent edits
+    of the same order add up instead of overwriting each other. The same
+    delta is applied to the daily sales rollup. Does not commit.
+
+    Args:
+        db: Database session
+        order: Order the service belongs to (its totals are refreshed in place)
+        cost: Change in cost price (new - old; negative when a service is removed)
+        sale: Change in sale price (new - old; negative when a service is removed)
+    """
+    if cost or sale:
+        result = await db.execute(
+            update(Order)
+            .where(Order.id == order.id)
+            .values(
+                total_cost_price=Order.total_cost_price + cost,
+                total_sale_price=Order.total_sale_price + sale,
+            )
+            .returning(Order.total_cost_price, Order.total_sale_price)
+            .execution_options(synchronize_session=False)
+        )
+        total_cost, total_sale = result.one()
+        set_committed_value(order, "total_cost_price", total_cost)
+        set_committed_value(order, "total_sale_price", total_sale)
+
+        await daily_stats_service.apply_order_delta(db, order, cost=cost, sale=sale)
+
+    invalidate_on_commit(db)
 
 
-def generate_order_number() -> str:
+def _counted_route(service: Service | service_schemas.ServiceBase) -> tuple[int, int] | None:
     """
-    Generate a unique order number.
-    Format: ORD-YYYY-XXXX where XXXX is a random hex.
+    Route a service counts towards in the sales counters.
+
+    Only FLIGHT and BUS services with both origin and destination count.
+
+    Returns:
+        (origin_location_id, destination_location_id) or None
     """
-    year = datetime.now().year
-    random_hex = secrets.token_hex(2).upper()
-    return f"ORD-{year}-{random_hex}"
+    if service.service_type not in [ServiceType.FLIGHT, ServiceType.BUS]:
+        return None
+    if not service.origin_location_id or not service.destination_location_id:
+        return None
+    return service.origin_location_id, service.destination_location_id
 
 
-async def recalculate_order_totals(db: AsyncSession, order: Order) -> None:
+async def _increment_sales_counters(
+    db: AsyncSession,
+    user_id: int | None,
+    routes: Counter[tuple[int, int]]
+) -> None:
     """
-    Recalculate and update order totals based on its services.
+    Add sales to an operator's sales_count and to the routes' PopularTrip counters.
+
+    One UPDATE for the operator and one multi-row INSERT ... ON CONFLICT DO
+    UPDATE for every route, however many sales are added. Both are atomic,
+    so concurrent sales neither lose increments nor collide on the
+    unique_route constraint. Does not commit.
 
     Args:
         db: Database session
-        order: Order instance to recalculate
+        user_id: Operator credited with the sales (None to only touch the routes)
+        routes: Number of sales per (origin_location_id, destination_location_id)
     """
-    # Get all services for this order
-    result = await db.execute(
-        select(Service).where(Service.order_id == order.id)
-    )
-    services = result.scalars().all()
+    if not routes:
+        return
 
-    # Calculate totals
-    total_cost = sum(service.cost_price for service in services)
-    total_sale = sum(service.sale_price for service in services)
+    if user_id:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(sales_count=User.sales_count + sum(routes.values()))
+            .execution_options(synchronize_session=False)
+        )
 
-    # Update order
-    order.total_cost_price = Decimal(str(total_cost))
-    order.total_sale_price = Decimal(str(total_sale))
+    stmt = pg_insert(PopularTrip).values([
+        {
+            "origin_location_id": origin_location_id,
+            "destination_location_id": destination_location_id,
+            "sales_count": count,
+        }
+        # Sorted so concurrent writers lock the routes in the same order
+        for (origin_location_id, destination_location_id), count in sorted(routes.items())
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        constraint="unique_route",
+        set_={"sales_count": PopularTrip.sales_count + stmt.excluded.sales_count}
+    ))
+
+
+async def _adjust_sales_counters(
+    db: AsyncSession,
+    user_id: int | None,
+    route: tuple[int, int],
+    delta: int
+) -> None:
+    """
+    Add delta to an operator's sales_count and to a route's PopularTrip counter.
 
-    await db.commit()
+    Each counter is changed by one atomic statement (see
+    _increment_sales_counters for increments). Counters never go below
+    zero. Does not commit.
+
+    Args:
+        db: Database session
+        user_id: Operator credited with the sale (None to only touch the route)
+        route: (origin_location_id, destination_location_id)
+        delta: Amount to add (negative to decrement)
+    """
+    if delta > 0:
+        await _increment_sales_counters(db, user_id, Counter({route: delta}))
+        return
+
+    if user_id:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(sales_count=func.greatest(User.sales_count + delta, 0))
+            .execution_options(synchronize_session=False)
+        )
+
+    origin_location_id, destination_location_id = route
+    await db.execute(
+        update(PopularTrip)
+        .where(
+            PopularTrip.origin_location_id == origin_location_id,
+            PopularTrip.destination_location_id == destination_location_id
+        )
+        .values(sales_count=func.greatest(PopularTrip.sales_count + delta, 0))
+        .execution_options(synchronize_session=False)
+    )
 
 
 async def update_sales_counters(
     db: AsyncSession,
-    user: User,
+    order: Order,
     service: Service
 ) -> None:
     """
     Update sales counters when a FLIGHT or BUS service is added.
 
+    The sale is credited to the order's operator, like every other counter
+    change and reconcile_sales_counters. Does not commit.
+
     Args:
         db: Database session
-        user: User (operator) who made the sale
+        order: Order the service was added to
         service: Service that was added
     """
-    # Only update for FLIGHT and BUS services
-    if service.service_type not in [ServiceType.FLIGHT, ServiceType.BUS]:
+    route = _counted_route(service)
+    if route is None:
         return
 
-    # Check if service has origin and destination
-    if not service.origin_location_id or not service.destination_location_id:
-        return
+    await _adjust_sales_counters(db, order.user_id, route, 1)
+    invalidate_on_commit(db)
 
-    # Increment user sales_count
-    user.sales_count += 1
 
-    # Update or create popular_trip
-    result = await db.execute(
-        select(PopularTrip).where(
-            PopularTrip.origin_location_id == service.origin_location_id,
-            PopularTrip.destination_location_id == service.destination_location_id
+async def reconcile_sales_counters(db: AsyncSession) -> dict[str, int]:
+    """
+    Recompute PopularTrip and User sales counters from the services table.
+
+    Repairs any drift left by failed writes or direct database edits.
+    Only rows whose counter differs are updated.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of repaired rows per counter table
+    """
+    counted = and_(
+        Service.service_type.in_([ServiceType.FLIGHT, ServiceType.BUS]),
+        Service.origin_location_id.is_not(None),
+        Service.destination_location_id.is_not(None),
+    )
+
+    # Routes: correct existing rows, then insert routes that have no row yet
+    route_count = func.coalesce(
+        select(func.count(Service.id))
+        .where(
+            counted,
+            Service.origin_location_id == PopularTrip.origin_location_id,
+            Service.destination_location_id == PopularTrip.destination_location_id,
         )
+        .scalar_subquery(),
+        0,
     )
-    popular_trip = result.scalar_one_or_none()
-
-    if popular_trip:
-        popular_trip.sales_count += 1
-    else:
-        popular_trip = PopularTrip(
-            origin_location_id=service.origin_location_id,
-            destination_location_id=service.destination_location_id,
-            sales_count=1
+    routes_result = await db.execute(
+        update(PopularTrip)
+        .where(PopularTrip.sales_count != route_count)
+        .values(sales_count=route_count)
+    )
+
+    missing_routes = (
+        select(
+            Service.origin_location_id,
+            Service.destination_location_id,
+            func.count(Service.id),
         )
-        db.add(popular_trip)
+        .where(counted)
+        .group_by(Service.origin_location_id, Service.destination_location_id)
+    )
+    inserted_result = await db.execute(
+        pg_insert(PopularTrip)
+        .from_select(["origin_location_id", "destination_location_id", "sales_count"], missing_routes)
+        .on_conflict_do_nothing(constraint="unique_route")
+    )
+
+    # Operators: services sold on their orders
+    user_count = func.coalesce(
+        select(func.count(Service.id))
+        .join(Order, Service.order_id == Order.id)
+        .where(counted, Order.user_id == User.id)
+        .scalar_subquery(),
+        0,
+    )
+    users_result = await db.execute(
+        update(User)
+        .where(User.sales_count != user_count)
+        .values(sales_count=user_count)
+    )
 
+    invalidate_on_commit(db)
     await db.commit()
 
+    return {
+        "popular_trips": routes_result.rowcount + inserted_result.rowcount,
+        "users": users_result.rowcount,
+    }
+
+
+async def _insert_order(
+    db: AsyncSession,
+    customer_id: int,
+    user: User,
+    total_cost: Decimal = Decimal("0.00"),
+    total_sale: Decimal = Decimal("0.00")
+) -> Order:
+    """
+    Insert an order with the given totals and count it in the daily sales rollup.
+
+    Raises:
+        ValueError: If customer doesn't exist
+    """
+    # Verify customer exists
+    result = await db.execute(
+        select(Customer).where(Customer.id == customer_id)
+    )
+    customer = result.scalar_one_or_none()
+    if not customer:
+        raise ValueError(f"Customer with id {customer_id} not found")
+
+    # Create order (the order number comes from a sequence inside the INSERT)
+    new_order = Order(
+        # custom_ticket_number=order_data.custom_ticket_number,  # Column doesn't exist in DB yet
+        user_id=user.id,
+        customer_id=customer_id,
+        total_cost_price=total_cost,
+        total_sale_price=total_sale,
+        # observations=order_data.observations,  # Column doesn't exist in DB yet
+        # attachment_urls=order_data.attachment_urls  # Column doesn't exist in DB yet
+    )
+
+    db.add(new_order)
+    await db.flush()
+
+    # Count the order in the daily sales rollup
+    await daily_stats_service.apply_order_delta(
+        db, new_order, order_count=1, cost=total_cost, sale=total_sale
+    )
+    invalidate_on_commit(db)
+    return new_order
+
 
 async def create_order(
     db: AsyncSession,
@@ -118,30 +332,77 @@ async def create_order(
     Raises:
         ValueError: If customer doesn't exist
     """
-    # Verify customer exists
+    new_order = await _insert_order(db, order_data.customer_id, user)
+    await db.refresh(new_order)
+    return new_order
+
+
+async def create_order_with_services(
+    db: AsyncSession,
+    order_data: order_schemas.OrderCreateWithServices,
+    user: User
+) -> Order:
+    """
+    Create an order together with all of its services.
+
+    The services are inserted with one multi-row INSERT, the order totals
+    and the daily rollup are computed once from the payload, and the sales
+    counters are updated with one statement per table. Like every mutation
+    here it only flushes, so the request commits the order and its services
+    together.
+
+    Args:
+        db: Database session
+        order_data: Order and services creation data
+        user: User (operator) creating the order
+
+    Returns:
+        Created order with its customer and services loaded
+
+    Raises:
+        ValueError: If customer doesn't exist or an associated_service_index is invalid
+    """
+    services = order_data.services
+    for position, service in enumerate(services):
+        index = service.associated_service_index
+        if index is not None and (index == position or not 0 <= index < len(services)):
+            raise ValueError(f"Service {position} has an invalid associated_service_index {index}")
+
+    new_order = await _insert_order(
+        db,
+        order_data.customer_id,
+        user,
+        total_cost=sum((service.cost_price for service in services), Decimal("0.00")),
+        total_sale=sum((service.sale_price for service in services), Decimal("0.00")),
+    )
+
+    # render_nulls keeps every row in one multi-row INSERT (by default rows
+    # with different None fields are split into separate statements)
     result = await db.execute(
-        select(Customer).where(Customer.id == order_data.customer_id)
+        insert(Service)
+        .returning(Service.id, sort_by_parameter_order=True)
+        .execution_options(render_nulls=True),
+        [
+            {**service.model_dump(exclude={"associated_service_index"}), "order_id": new_order.id}
+            for service in services
+        ]
     )
-    customer = result.scalar_one_or_none()
-    if not customer:
-        raise ValueError(f"Customer with id {order_data.customer_id} not found")
+    service_ids = result.scalars().all()
 
-    # Create order
-    new_order = Order(
-        order_number=generate_order_number(),
-        # custom_ticket_number=order_data.custom_ticket_number,  # Column doesn't exist in DB yet
-        user_id=user.id,
-        customer_id=order_data.customer_id,
-        total_cost_price=Decimal("0.00"),
-        total_sale_price=Decimal("0.00"),
-        # observations=order_data.observations,  # Column doesn't exist in DB yet
-        # attachment_urls=order_data.attachment_urls  # Column doesn't exist in DB yet
+    # Point luggage at the services created with it, now that they have IDs
+    associations = [
+        {"id": service_ids[position], "associated_service_id": service_ids[service.associated_service_index]}
+        for position, service in enumerate(services)
+        if service.associated_service_index is not None
+    ]
+    if associations:
+        await db.execute(update(Service), associations)
+
+    await _increment_sales_counters(
+        db, new_order.user_id, Counter(route for route in map(_counted_route, services) if route)
     )
 
-    db.add(new_order)
-    await db.commit()
-    await db.refresh(new_order)
-    return new_order
+    return await get_order(db, new_order.id, with_details=True)
 
 
 async def get_order(
@@ -320,7 +581,7 @@ async def update_order(
     for field, value in update_data.items():
         setattr(order, field, value)
 
-    await db.commit()
+    await db.flush()
     await db.refresh(order)
     return order
 
@@ -335,7 +596,7 @@ async def add_service_to_order(
 
     This function:
     1. Creates the service
-    2. Recalculates order totals
+    2. Adds its prices to the order totals
     3. Updates sales counters if applicable
 
     Args:
@@ -354,25 +615,21 @@ async def add_service_to_order(
     if not order:
         raise ValueError(f"Order with id {service_data.order_id} not found")
 
-    try:
-        # Create service
-        new_service = Service(**service_data.model_dump())
-        db.add(new_service)
-        await db.flush()  # Get the service ID
+    # Create service
+    new_service = Service(**service_data.model_dump())
+    db.add(new_service)
+    await db.flush()  # Get the service ID
 
-        # Recalculate order totals
-        await recalculate_order_totals(db, order)
+    # Add the service to the order totals
+    await apply_order_totals_delta(db, order, new_service.cost_price, new_service.sale_price)
 
-        # Update sales counters
-        await update_sales_counters(db, user, new_service)
+    # Update sales counters
+    await update_sales_counters(db, order, new_service)
+    await db.flush()
 
-        # Refresh to get updated relationships
-        await db.refresh(new_service)
-        return new_service
-
-    except Exception as e:
-        await db.rollback()
-        raise e
+    # Refresh to get updated relationships
+    await db.refresh(new_service)
+    return new_service
 
 
 async def update_service(
@@ -382,7 +639,10 @@ async def update_service(
     user: User
 ) -> Service | None:
     """
-    Update a service and recalculate order totals.
+    Update a service and apply its price change to the order totals.
+
+    If the change makes the service stop or start counting as a FLIGHT/BUS
+    sale (or moves it to another route), the sales counters follow.
 
     Args:
         db: Database session
@@ -404,21 +664,34 @@ async def update_service(
     if not order:
         return None
 
-    try:
-        # Update service
-        update_data = service_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(service, field, value)
+    previous_route = _counted_route(service)
+    previous_cost = service.cost_price
+    previous_sale = service.sale_price
 
-        # Recalculate order totals
-        await recalculate_order_totals(db, order)
-
-        await db.refresh(service)
-        return service
+    # Update service
+    update_data = service_data.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(service, field, value)
+
+    # Move the sale between counters if its type or route changed
+    route = _counted_route(service)
+    if route != previous_route:
+        if previous_route:
+            await _adjust_sales_counters(db, order.user_id, previous_route, -1)
+        if route:
+            await _adjust_sales_counters(db, order.user_id, route, 1)
+
+    # Apply the price change to the order totals
+    await apply_order_totals_delta(
+        db,
+        order,
+        cost=service.cost_price - previous_cost,
+        sale=service.sale_price - previous_sale,
+    )
+    await db.flush()
 
-    except Exception as e:
-        await db.rollback()
-        raise e
+    await db.refresh(service)
+    return service
 
 
 async def delete_service(
@@ -426,7 +699,7 @@ async def delete_service(
     service_id: int
 ) -> bool:
     """
-    Delete a service and recalculate order totals.
+    Delete a service, decrement its sales counters and subtract it from the order totals.
 
     Args:
         db: Database session
@@ -446,18 +719,19 @@ async def delete_service(
     if not order:
         return False
 
-    try:
-        # Delete service (cascade will delete images)
-        await db.delete(service)
+    # Remove the sale from the counters
+    route = _counted_route(service)
+    if route:
+        await _adjust_sales_counters(db, order.user_id, route, -1)
 
-        # Recalculate order totals
-        await recalculate_order_totals(db, order)
+    # Delete service (cascade will delete images)
+    await db.delete(service)
 
-        return True
+    # Remove the service from the order totals
+    await apply_order_totals_delta(db, order, -service.cost_price, -service.sale_price)
+    await db.flush()
 
-    except Exception as e:
-        await db.rollback()
-        raise e
+    return True
 
 
 async def add_service_images(
@@ -511,7 +785,7 @@ async def add_service_images(
     ]
 
     db.add_all(images)
-    await db.commit()
+    await db.flush()
 
     for image in images:
         await db.refresh(image)
@@ -538,12 +812,27 @@ async def delete_order(
     if not order:
         return False
 
-    try:
-        # Delete order (cascade will delete all services and their images)
-        await db.delete(order)
-        await db.commit()
-        return True
+    # Remove the order from the daily sales rollup
+    await daily_stats_service.apply_order_delta(
+        db,
+        order,
+        order_count=-1,
+        cost=-order.total_cost_price,
+        sale=-order.total_sale_price,
+    )
+
+    # Remove the order's sales from the counters
+    result = await db.execute(
+        select(Service).where(Service.order_id == order.id)
+    )
+    for service in result.scalars().all():
+        route = _counted_route(service)
+        if route:
+            await _adjust_sales_counters(db, order.user_id, route, -1)
+
+    # Delete order (cascade will delete all services and their images)
+    await db.delete(order)
+    await db.flush()
+    invalidate_on_commit(db)
+    return True
 
-    except Exception as e:
-        await db.rollback()
-        raise e
@@ -1,18 +1,383 @@
-"""Statistics and analytics service."""
-
-from datetime import datetime
+"""
+Statistics and analytics service.
+
+Read functions are cached in-process (see app.core.cache) and invalidated
+whenever order_service or customer_service commits a write. Cache misses
+are coalesced (see app.core.coalesce), so concurrent identical requests
+run the query once.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 
-from sqlalchemy import select, func
+from sqlalchemy import DateTime, select, func, and_, cast, extract, true
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
+from app.core.cache import cached, stats_cache
+from app.core.coalesce import coalesced
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.customer import Customer
 from app.models.order import Order
+from app.models.order_daily_stats import OrderDailyStats
 from app.models.user import User
 from app.models.popular_trip import PopularTrip
-from app.models.location import Location
 
 
+def _growth_percentage(recent: int, previous: int) -> float:
+    """Percentage growth of recent over previous (0 when there is no baseline)."""
+    if previous > 0:
+        return ((recent - previous) / previous) * 100
+    return 0.0
+
+
+@cached("metrics")
+@coalesced("metrics", cache=stats_cache)
+async def get_dashboard_metrics(db: AsyncSession) -> dict:
+    """
+    Get dashboard summary metrics in a single round trip.
+
+    Totals and the two 30-day growth windows are computed with
+    conditional aggregates (COUNT(*) FILTER (WHERE ...)) over one scan of
+    customers and one scan of orders, joined into a single statement.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dictionary matching the DashboardMetrics schema
+    """
+    # UTC, like the daily rollup's days (see get_targets)
+    now = datetime.now(UTC)
+    thirty_days_ago = now - timedelta(days=30)
+    sixty_days_ago = now - timedelta(days=60)
+
+    customers = select(
+        func.count().label("total_customers"),
+        func.count().filter(Customer.created_at >= thirty_days_ago).label("recent_customers"),
+        func.count().filter(
+            and_(
+                Customer.created_at >= sixty_days_ago,
+                Customer.created_at < thirty_days_ago,
+            )
+        ).label("previous_customers"),
+    ).subquery("customer_metrics")
+
+    orders = select(
+        func.count().label("total_orders"),
+        func.sum(Order.total_sale_price - Order.total_cost_price).label("total_profit"),
+        func.count().filter(Order.created_at >= thirty_days_ago).label("recent_orders"),
+        func.count().filter(
+            and_(
+                Order.created_at >= sixty_days_ago,
+                Order.created_at < thirty_days_ago,
+            )
+        ).label("previous_orders"),
+    ).subquery("order_metrics")
+
+    stmt = select(customers, orders).select_from(customers.join(orders, true()))
+    row = (await db.execute(stmt)).one()
+
+    customers_growth = _growth_percentage(row.recent_customers, row.previous_customers)
+    orders_growth = _growth_percentage(row.recent_orders, row.previous_orders)
+
+    return {
+        "total_customers": row.total_customers,
+        "total_orders": row.total_orders,
+        # All orders are considered paid
+        "total_paid_orders": row.total_orders,
+        "total_profit": row.total_profit or Decimal("0"),
+        "customers_growth": round(customers_growth, 2),
+        "orders_growth": round(orders_growth, 2),
+    }
+
+
+# Profit targets shown on the dashboard cards.
+# "current" is the window reported in the card's secondary figure.
+TARGET_DEFINITIONS = {
+    "daily": {
+        "title": "Daily Profit Target",
+        "subtitle": "Today's profit margin goal",
+        "current_label": "Today",
+        # Target: average ~$300 profit per day (based on ~3 orders with ~$100 avg profit)
+        "target_profit": Decimal("300"),
+        "period": "today",
+        "previous": "yesterday",
+        "current": "today",
+    },
+    "monthly": {
+        "title": "Monthly Profit Target",
+        "subtitle": "This month's profit margin goal",
+        "current_label": "Today",
+        # Target: ~$9K profit per month (30 days * $300/day)
+        "target_profit": Decimal("9000"),
+        "period": "this_month",
+        "previous": "previous_month",
+        "current": "today",
+    },
+    "annual": {
+        "title": "Annual Profit Target",
+        "subtitle": "This year's profit margin goal",
+        "current_label": "This Month",
+        # Target: ~$108K profit per year (12 months * $9K/month)
+        "target_profit": Decimal("108000"),
+        "period": "this_year",
+        "previous": "previous_year",
+        "current": "this_month",
+    },
+}
+
+
+def _format_currency(value: Decimal) -> str:
+    """Format a profit amount for the target cards."""
+    if value >= 1000:
+        return f"${value / 1000:.1f}K"
+    return f"${value:.0f}"
+
+
+def _profit_windows(today: date) -> dict[str, tuple[date, date | None]]:
+    """
+    Profit windows used by the target cards as (start, end) day pairs.
+
+    Current windows are open-ended (the query itself stops at today),
+    previous windows are half-open and end where the current one starts.
+    """
+    month_start = today.replace(day=1)
+    year_start = month_start.replace(month=1)
+
+    if month_start.month == 1:
+        previous_month_start = month_start.replace(year=month_start.year - 1, month=12)
+    else:
+        previous_month_start = month_start.replace(month=month_start.month - 1)
+
+    return {
+        "today": (today, None),
+        "yesterday": (today - timedelta(days=1), today),
+        "this_month": (month_start, None),
+        "previous_month": (previous_month_start, month_start),
+        "this_year": (year_start, None),
+        "previous_year": (year_start.replace(year=year_start.year - 1), year_start),
+    }
+
+
+@cached("targets")
+@coalesced("targets", cache=stats_cache)
+async def get_targets(
+    db: AsyncSession,
+    target_types: list[str] | None = None
+) -> dict[str, dict]:
+    """
+    Get profit target progress for one or more target types in a single query.
+
+    Every window sum (current period, previous period, today, this month)
+    is computed with SUM(...) FILTER (WHERE ...) over a single scan of the
+    daily sales rollup covering the union of the requested windows.
+
+    Args:
+        db: Database session
+        target_types: Target types to compute ('daily', 'monthly', 'annual').
+            Defaults to all of them.
+
+    Returns:
+        Dictionary of target type to data matching the TargetData schema
+
+    Raises:
+        ValueError: If an unknown target type is requested
+    """
+    if target_types is None:
+        target_types = list(TARGET_DEFINITIONS)
+
+    for target_type in target_types:
+        if target_type not in TARGET_DEFINITIONS:
+            raise ValueError("Invalid target_type. Must be 'daily', 'monthly', or 'annual'")
+
+    # The daily rollup is keyed by UTC day
+    today = datetime.now(UTC).date()
+    windows = _profit_windows(today)
+
+    needed = {
+        window
+        for target_type in target_types
+        for window in (
+            TARGET_DEFINITIONS[target_type]["period"],
+            TARGET_DEFINITIONS[target_type]["previous"],
+            TARGET_DEFINITIONS[target_type]["current"],
+        )
+    }
+
+    day = OrderDailyStats.day
+    columns = []
+    for window in sorted(needed):
+        start, end = windows[window]
+        condition = day >= start
+        if end is not None:
+            condition = and_(condition, day < end)
+        columns.append(func.sum(OrderDailyStats.total_profit).filter(condition).label(window))
+
+    earliest = min(windows[window][0] for window in needed)
+    stmt = select(*columns).where(and_(day >= earliest, day <= today))
+    row = (await db.execute(stmt)).one()
+    sums = {window: getattr(row, window) or Decimal("0") for window in needed}
+
+    targets = {}
+    for target_type in target_types:
+        definition = TARGET_DEFINITIONS[target_type]
+        target_profit = definition["target_profit"]
+        current_profit = sums[definition["period"]]
+        prev_profit = sums[definition["previous"]]
+        current_value = sums[definition["current"]]
+
+        # Calculate percentage of target achieved
+        percentage = float((current_profit / target_profit) * 100) if target_profit > 0 else 0.0
+
+        # Calculate growth
+        growth = 0.0
+        if prev_profit > 0:
+            growth = ((current_profit - prev_profit) / prev_profit) * 100
+
+        targets[target_type] = {
+            "title": definition["title"],
+            "subtitle": definition["subtitle"],
+            "percentage": round(percentage, 2),
+            "percentage_change": f"+{growth:.0f}%" if growth >= 0 else f"{growth:.0f}%",
+            "message": f"{percentage:.1f}% of profit target achieved",
+            "target": _format_currency(target_profit),
+            "profit": _format_currency(current_profit),
+            "current": _format_currency(current_value),
+            "current_label": definition["current_label"],
+            "target_direction": "down" if percentage < 100 else "up",
+            "profit_direction": "up" if growth >= 0 else "down",
+            "current_direction": "up" if current_value > 0 else "down",
+        }
+
+    return targets
+
+
+def _year_range(year: int) -> tuple[date, date]:
+    """Half-open [start, end) day range covering a calendar year."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def _monthly_sales_stmt(year: int):
+    """
+    Monthly order count and revenue for a year and the year before it.
+
+    Reads the daily sales rollup on a plain day range (served by its
+    primary key) and covers both years in one scan for the growth figure.
+    """
+    start, _ = _year_range(year - 1)
+    _, end = _year_range(year)
+    day = OrderDailyStats.day
+    stats_year = extract("year", day).label("year")
+    stats_month = extract("month", day).label("month")
+
+    return (
+        select(
+            stats_year,
+            stats_month,
+            func.sum(OrderDailyStats.order_count).label("count"),
+            func.sum(OrderDailyStats.total_sale).label("revenue"),
+        )
+        .where(and_(day >= start, day < end))
+        .group_by(stats_year, stats_month)
+    )
+
+
+def _statistics_chart_stmt(year: int):
+    """Monthly order count and profit for a year from the daily sales rollup."""
+    start, end = _year_range(year)
+    day = OrderDailyStats.day
+    stats_month = extract("month", day).label("month")
+
+    return (
+        select(
+            stats_month,
+            func.sum(OrderDailyStats.order_count).label("count"),
+            func.sum(OrderDailyStats.total_profit).label("profit"),
+        )
+        .where(and_(day >= start, day < end))
+        .group_by(stats_month)
+    )
+
+
+@cached("monthly-sales")
+@coalesced("monthly-sales", cache=stats_cache)
+async def get_monthly_sales(db: AsyncSession, year: int) -> dict:
+    """
+    Get monthly sales counts, yearly revenue and growth vs the previous year.
+
+    Args:
+        db: Database session
+        year: Calendar year
+
+    Returns:
+        Dictionary matching the YearlySalesData schema
+    """
+    # Initialize sales array with 12 zeros
+    monthly_sales = [0] * 12
+    previous_year_sales = 0
+    total_revenue = Decimal("0")
+
+    result = await db.execute(_monthly_sales_stmt(year))
+    for row in result.all():
+        if int(row.year) == year:
+            monthly_sales[int(row.month) - 1] = int(row.count)
+            total_revenue += row.revenue or Decimal("0")
+        else:
+            previous_year_sales += int(row.count)
+
+    total_sales_count = sum(monthly_sales)
+
+    growth = 0.0
+    if previous_year_sales > 0:
+        growth = ((total_sales_count - previous_year_sales) / previous_year_sales) * 100
+
+    return {
+        "year": year,
+        "sales": monthly_sales,
+        "total_sales": f"${total_revenue:,.0f}",
+        "growth": f"+{growth:.0f}%" if growth >= 0 else f"{growth:.0f}%",
+    }
+
+
+@cached("statistics-chart")
+@coalesced("statistics-chart", cache=stats_cache)
+async def get_statistics_chart(db: AsyncSession, year: int) -> dict:
+    """
+    Get sales count and profit margin per month for the statistics chart.
+
+    Args:
+        db: Database session
+        year: Calendar year
+
+    Returns:
+        Dictionary matching the StatisticsChartData schema
+    """
+    # Initialize arrays with 12 zeros
+    monthly_sales = [0] * 12
+    monthly_profit = [0.0] * 12
+
+    result = await db.execute(_statistics_chart_stmt(year))
+    for row in result.all():
+        month_index = int(row.month) - 1  # Convert to 0-indexed
+        monthly_sales[month_index] = int(row.count)
+        # Convert profit to hundreds for better chart visualization
+        profit_in_hundreds = float(row.profit or 0) / 100
+        monthly_profit[month_index] = round(profit_in_hundreds, 1)
+
+    return {
+        "year": year,
+        "sales": monthly_sales,
+        "profit": monthly_profit,
+    }
+
+
+@cached("profits")
+@coalesced("profits", cache=stats_cache)
 async def get_profit_stats(
     db: AsyncSession,
     start_date: datetime | None = None,
@@ -22,6 +387,10 @@ async def get_profit_stats(
     """
     Get profit statistics grouped by time period.
 
+    Reads the daily sales rollup, so the date filters apply at day
+    granularity (both bounds inclusive) and the cost grows with the number
+    of days rather than the number of orders.
+
     Args:
         db: Database session
         start_date: Start date filter
@@ -39,23 +408,27 @@ async def get_profit_stats(
         "year": "year"
     }.get(group_by, "month")
 
+    period = func.date_trunc(
+        trunc_format, cast(OrderDailyStats.day, DateTime(timezone=True))
+    ).label("period")
+
     # Build base query
     stmt = select(
-        func.date_trunc(trunc_format, Order.created_at).label("period"),
-        func.sum(Order.total_cost_price).label("total_cost"),
-        func.sum(Order.total_sale_price).label("total_sales"),
-        func.sum(Order.total_sale_price - Order.total_cost_price).label("total_profit"),
-        func.count(Order.id).label("order_count")
+        period,
+        func.sum(OrderDailyStats.total_cost).label("total_cost"),
+        func.sum(OrderDailyStats.total_sale).label("total_sales"),
+        func.sum(OrderDailyStats.total_profit).label("total_profit"),
+        func.sum(OrderDailyStats.order_count).label("order_count")
     )
 
     # Apply date filters
     if start_date:
-        stmt = stmt.where(Order.created_at >= start_date)
+        stmt = stmt.where(OrderDailyStats.day >= start_date.date())
     if end_date:
-        stmt = stmt.where(Order.created_at <= end_date)
+        stmt = stmt.where(OrderDailyStats.day <= end_date.date())
 
     # Group and order
-    stmt = stmt.group_by("period").order_by("period")
+    stmt = stmt.group_by(period).order_by(period)
 
     # Execute query
     result = await db.execute(stmt)
@@ -69,30 +442,15 @@ async def get_profit_stats(
             "total_cost": float(row.total_cost or 0),
             "total_sales": float(row.total_sales or 0),
             "total_profit": float(row.total_profit or 0),
-            "order_count": row.order_count or 0
+            "order_count": int(row.order_count or 0)
         })
 
-    # Calculate summary totals
-    summary_stmt = select(
-        func.sum(Order.total_cost_price).label("total_cost"),
-        func.sum(Order.total_sale_price).label("total_sales"),
-        func.sum(Order.total_sale_price - Order.total_cost_price).label("total_profit"),
-        func.count(Order.id).label("order_count")
-    )
-
-    if start_date:
-        summary_stmt = summary_stmt.where(Order.created_at >= start_date)
-    if end_date:
-        summary_stmt = summary_stmt.where(Order.created_at <= end_date)
-
-    summary_result = await db.execute(summary_stmt)
-    summary_row = summary_result.one()
-
+    # Summary totals are the sum of all periods
     summary = {
-        "total_cost": float(summary_row.total_cost or 0),
-        "total_sales": float(summary_row.total_sales or 0),
-        "total_profit": float(summary_row.total_profit or 0),
-        "order_count": summary_row.order_count or 0
+        "total_cost": float(sum(row.total_cost or 0 for row in rows)),
+        "total_sales": float(sum(row.total_sales or 0 for row in rows)),
+        "total_profit": float(sum(row.total_profit or 0 for row in rows)),
+        "order_count": int(sum(row.order_count or 0 for row in rows))
     }
 
     return {
@@ -101,13 +459,18 @@ async def get_profit_stats(
     }
 
 
+@cached("popular-trips")
+@coalesced("popular-trips", cache=stats_cache)
 async def get_popular_trips(
     db: AsyncSession,
     limit: int = 10
 ) -> list[dict]:
     """
-    Get ranking of most sold routes based on actual services sold.
-    Calculates dynamically from services table (FLIGHT and BUS types).
+    Get ranking of most sold routes.
+
+    Served from the popular_trips counters maintained by order_service
+    (ordered through the sales_count index), with both locations joined
+    in the same statement.
 
     Args:
         db: Database session
@@ -116,52 +479,28 @@ async def get_popular_trips(
     Returns:
         List of popular trips with location details and sales count
     """
-    from app.models.service import Service, ServiceType
-
-    # Query to count services by route (origin -> destination)
-    # Only count FLIGHT and BUS services from paid orders
     stmt = (
-        select(
-            Service.origin_location_id,
-            Service.destination_location_id,
-            func.count(Service.id).label("sales_count")
+        select(PopularTrip)
+        .options(
+            joinedload(PopularTrip.origin_location),
+            joinedload(PopularTrip.destination_location)
         )
-        .join(Order, Service.order_id == Order.id)
-        .where(
-            Service.service_type.in_([ServiceType.FLIGHT, ServiceType.BUS]),
-            Service.origin_location_id.is_not(None),
-            Service.destination_location_id.is_not(None),
-        )
-        .group_by(Service.origin_location_id, Service.destination_location_id)
-        .order_by(func.count(Service.id).desc())
+        .where(PopularTrip.sales_count > 0)
+        .order_by(PopularTrip.sales_count.desc(), PopularTrip.id)
         .limit(limit)
     )
 
     result = await db.execute(stmt)
-    rows = result.all()
-
-    # Fetch location details for each route
-    popular_trips = []
-    for row in rows:
-        # Get origin location
-        origin_stmt = select(Location).where(Location.id == row.origin_location_id)
-        origin_result = await db.execute(origin_stmt)
-        origin_location = origin_result.scalar_one_or_none()
-
-        # Get destination location
-        dest_stmt = select(Location).where(Location.id == row.destination_location_id)
-        dest_result = await db.execute(dest_stmt)
-        dest_location = dest_result.scalar_one_or_none()
-
-        if origin_location and dest_location:
-            popular_trips.append({
-                "id": row.origin_location_id * 1000 + row.destination_location_id,  # Generate unique ID
-                "origin_location": origin_location,
-                "destination_location": dest_location,
-                "sales_count": row.sales_count
-            })
 
-    return popular_trips
+    return [
+        {
+            "id": trip.id,
+            "origin_location": trip.origin_location,
+            "destination_location": trip.destination_location,
+            "sales_count": trip.sales_count
+        }
+        for trip in result.scalars().all()
+    ]
 
 
 async def get_top_sellers(
@@ -187,3 +526,126 @@ async def get_top_sellers(
 
     result = await db.execute(stmt)
     return list(result.scalars().all())
+
+
+async def get_top_sellers_in_window(
+    db: AsyncSession,
+    start_date: datetime,
+    end_date: datetime | None = None,
+    limit: int = 10
+) -> list[dict]:
+    """
+    Rank operators by orders sold within a date window.
+
+    Counts and profit are aggregated from orders in one query (served by
+    the orders(user_id, created_at) index), so deleted sales are never
+    counted. Results for windows that already ended are cached for
+    STATS_CLOSED_PERIOD_CACHE_TTL_SECONDS, until the next write.
+
+    Args:
+        db: Database session
+        start_date: Window start (inclusive)
+        end_date: Window end (exclusive); defaults to now, which is never cached
+        limit: Maximum number of results
+
+    Returns:
+        List of operators with order_count, total_sales and total_profit
+    """
+    if end_date is not None and end_date <= datetime.now(end_date.tzinfo):
+        return await _get_closed_window_top_sellers(db, start_date, end_date, limit)
+    return await _query_top_sellers_in_window(db, start_date, end_date, limit)
+
+
+@cached("top-sellers", ttl=settings.STATS_CLOSED_PERIOD_CACHE_TTL_SECONDS)
+async def _get_closed_window_top_sellers(
+    db: AsyncSession,
+    start_date: datetime,
+    end_date: datetime,
+    limit: int
+) -> list[dict]:
+    """Ranking for a window that already ended (only writes can change it)."""
+    return await _query_top_sellers_in_window(db, start_date, end_date, limit)
+
+
+@coalesced("top-sellers", cache=stats_cache)
+async def _query_top_sellers_in_window(
+    db: AsyncSession,
+    start_date: datetime,
+    end_date: datetime | None,
+    limit: int
+) -> list[dict]:
+    """Run the windowed ranking query (see get_top_sellers_in_window)."""
+    order_count = func.count(Order.id).label("order_count")
+    total_profit = func.coalesce(
+        func.sum(Order.total_sale_price - Order.total_cost_price), 0
+    ).label("total_profit")
+
+    stmt = (
+        select(
+            User.id,
+            User.full_name,
+            User.email,
+            User.avatar,
+            order_count,
+            func.coalesce(func.sum(Order.total_sale_price), 0).label("total_sales"),
+            total_profit,
+        )
+        .join(Order, Order.user_id == User.id)
+        .where(Order.created_at >= start_date)
+        .group_by(User.id)
+        .order_by(order_count.desc(), total_profit.desc(), User.id)
+        .limit(limit)
+    )
+    if end_date is not None:
+        stmt = stmt.where(Order.created_at < end_date)
+
+    result = await db.execute(stmt)
+    return [dict(row._mapping) for row in result.all()]
+
+
+async def get_dashboard(
+    year: int,
+    popular_trips_limit: int = 10,
+    top_sellers_limit: int = 10,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal
+) -> dict:
+    """
+    Assemble every dashboard section concurrently.
+
+    Each section runs on its own session (and therefore its own pooled
+    connection) so the queries execute in parallel with asyncio.gather.
+    Sections still go through the stats cache.
+
+    Args:
+        year: Year for the monthly sales and statistics charts
+        popular_trips_limit: Maximum number of popular routes
+        top_sellers_limit: Maximum number of top sellers
+        session_factory: Factory opening a new session per section
+
+    Returns:
+        Dictionary matching the DashboardData schema, including the time
+        spent in each section in milliseconds
+    """
+    sections = {
+        "metrics": lambda db: get_dashboard_metrics(db),
+        "targets": lambda db: get_targets(db),
+        "monthly_sales": lambda db: get_monthly_sales(db, year),
+        "statistics_chart": lambda db: get_statistics_chart(db, year),
+        "popular_trips": lambda db: get_popular_trips(db, limit=popular_trips_limit),
+        "top_sellers": lambda db: get_top_sellers(db, limit=top_sellers_limit),
+    }
+
+    async def run_section(loader) -> tuple[object, float]:
+        started = time.perf_counter()
+        async with session_factory() as session:
+            result = await loader(session)
+        return result, round((time.perf_counter() - started) * 1000, 2)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_section(loader) for loader in sections.values()))
+    total_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    dashboard = {name: result for name, (result, _) in zip(sections, results, strict=True)}
+    dashboard["timings_ms"] = {name: elapsed for name, (_, elapsed) in zip(sections, results, strict=True)}
+    dashboard["timings_ms"]["total"] = total_ms
+    return dashboard
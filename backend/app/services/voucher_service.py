@@ -0,0 +1,383 @@
+"""
+Printable travel vouchers, one per order.
+
+A voucher lists the customer and every service of the order with its route,
+PNR or reservation number and route guide. Paragraph and table styles are
+built once per (worker) process at import time, and the static page frame
+(header band and footer note) is drawn once per document as a PDF form that
+every page reuses. Batches are split into chunks rendered across the voucher
+process pool and delivered as a ZIP of per-order PDFs or as one merged PDF.
+"""
+
+import asyncio
+import os
+import tempfile
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    BaseDocTemplate,
+    Frame,
+    KeepTogether,
+    PageBreak,
+    PageTemplate,
+    Paragraph,
+    Spacer,
+    Table,
+    TableStyle,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.workers import run_in_voucher_pool
+from app.models.order import Order
+from app.models.service import Service, ServiceType
+from app.services.export_service import ExportFile, format_location
+
+VOUCHER_FORMATS = ("zip", "pdf")
+
+
+class VoucherService(NamedTuple):
+    """One service line of a voucher, as plain values."""
+
+    service_type: str
+    name: str
+    status: str
+    company: Optional[str]
+    reference: Optional[str]  # PNR for transport, reservation number for hotels
+    origin: str
+    destination: str
+    route_guide: Optional[str]
+    starts_at: Optional[datetime]
+    ends_at: Optional[datetime]
+
+
+class VoucherOrder(NamedTuple):
+    """Everything printed on one voucher, picklable for the voucher pool."""
+
+    order_number: str
+    created_at: datetime
+    customer_name: str
+    document_id: Optional[str]
+    email: Optional[str]
+    phone_number: Optional[str]
+    total_sale_price: Decimal
+    services: tuple[VoucherService, ...]
+
+
+def _voucher_service(service: Service) -> VoucherService:
+    """Flatten a service (with its locations loaded) into a voucher line."""
+    if service.service_type == ServiceType.HOTEL:
+        reference = service.reservation_number
+        starts_at, ends_at = service.check_in_datetime, service.check_out_datetime
+        name = service.hotel_name or service.name
+    else:
+        reference = service.pnr_code
+        starts_at, ends_at = service.departure_datetime, service.arrival_datetime
+        name = service.name
+
+    return VoucherService(
+        service_type=service.service_type.value,
+        name=name,
+        status=service.status,
+        company=service.company,
+        reference=reference,
+        origin=format_location(service.origin_location),
+        destination=format_location(service.destination_location),
+        route_guide=service.route_guide,
+        starts_at=starts_at,
+        ends_at=ends_at,
+    )
+
+
+async def load_voucher_orders(db: AsyncSession, order_ids: list[int]) -> list[VoucherOrder]:
+    """
+    Load the orders to print, in the requested order.
+
+    Args:
+        db: Database session
+        order_ids: Order IDs (duplicates are printed once)
+
+    Returns:
+        One VoucherOrder per distinct order ID
+
+    Raises:
+        ValueError: If the batch is empty or too large, or an order does not exist
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids:
+        raise ValueError("At least one order is required")
+    if len(order_ids) > settings.VOUCHER_MAX_ORDERS:
+        raise ValueError(f"At most {settings.VOUCHER_MAX_ORDERS} vouchers can be generated at once")
+
+    result = await db.execute(
+        select(Order)
+        .where(Order.id.in_(order_ids))
+        .options(
+            selectinload(Order.customer),
+            selectinload(Order.services).selectinload(Service.origin_location),
+            selectinload(Order.services).selectinload(Service.destination_location)
+        )
+    )
+    orders = {order.id: order for order in result.scalars()}
+
+    missing = [order_id for order_id in order_ids if order_id not in orders]
+    if missing:
+        raise ValueError(f"Orders not found: {', '.join(map(str, missing))}")
+
+    return [
+        VoucherOrder(
+            order_number=order.order_number,
+            created_at=order.created_at,
+            customer_name=order.customer.full_name,
+            document_id=order.customer.document_id,
+            email=order.customer.email,
+            phone_number=order.customer.phone_number,
+            total_sale_price=order.total_sale_price,
+            services=tuple(
+                _voucher_service(service) for service in sorted(order.services, key=lambda s: s.id)
+            ),
+        )
+        for order in (orders[order_id] for order_id in order_ids)
+    ]
+
+
+# Styles shared by every voucher, built once per process
+VOUCHER_STYLES = getSampleStyleSheet()
+VOUCHER_TITLE_STYLE = ParagraphStyle(
+    'VoucherTitle',
+    parent=VOUCHER_STYLES['Heading1'],
+    fontSize=18,
+    textColor=colors.HexColor('#1F4E78'),
+    spaceAfter=6,
+)
+VOUCHER_CELL_STYLE = ParagraphStyle('VoucherCell', parent=VOUCHER_STYLES['Normal'], fontSize=8, leading=10)
+VOUCHER_NOTE_STYLE = ParagraphStyle(
+    'VoucherNote', parent=VOUCHER_CELL_STYLE, textColor=colors.HexColor('#555555')
+)
+VOUCHER_CUSTOMER_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ('LINEBELOW', (0, -1), (-1, -1), 0.5, colors.HexColor('#1F4E78')),
+])
+VOUCHER_SERVICE_HEADER = ['Service', 'Route', 'PNR / Ref.', 'Start', 'End', 'Status']
+VOUCHER_SERVICE_COL_WIDTHS = [1.4*inch, 2.0*inch, 0.9*inch, 1.0*inch, 1.0*inch, 0.7*inch]
+VOUCHER_SERVICE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1F4E78')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F2F2F2')]),
+])
+VOUCHER_TOTAL_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+    ('LINEABOVE', (0, 0), (-1, 0), 1, colors.HexColor('#1F4E78')),
+])
+VOUCHER_PAGE_FORM = "voucher_page"
+
+
+def _draw_page_frame(canvas, doc) -> None:
+    """Draw the parts of a voucher page that never change (stored as a form)."""
+    width, height = doc.pagesize
+    canvas.setFillColor(colors.HexColor('#1F4E78'))
+    canvas.rect(0, height - 0.8*inch, width, 0.8*inch, stroke=0, fill=1)
+    canvas.setFillColor(colors.white)
+    canvas.setFont('Helvetica-Bold', 16)
+    canvas.drawString(doc.leftMargin, height - 0.5*inch, settings.PROJECT_NAME)
+    canvas.setFont('Helvetica', 11)
+    canvas.drawRightString(width - doc.rightMargin, height - 0.5*inch, "Travel Voucher")
+
+    canvas.setStrokeColor(colors.grey)
+    canvas.line(doc.leftMargin, 0.75*inch, width - doc.rightMargin, 0.75*inch)
+    canvas.setFillColor(colors.grey)
+    canvas.setFont('Helvetica', 7)
+    canvas.drawString(
+        doc.leftMargin, 0.55*inch,
+        "Present this voucher with a valid ID at check-in."
+    )
+
+
+class _VoucherDocTemplate(BaseDocTemplate):
+    """A4 document whose static page frame is drawn once and reused on every page."""
+
+    def __init__(self, filename: str):
+        super().__init__(filename, pagesize=A4, topMargin=1.1*inch, bottomMargin=1*inch)
+        frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='body')
+        self.addPageTemplates([PageTemplate(id='voucher', frames=[frame], onPage=self._on_page)])
+        self._page_form_ready = False
+
+    def _on_page(self, canvas, doc) -> None:
+        if not self._page_form_ready:
+            canvas.beginForm(VOUCHER_PAGE_FORM)
+            _draw_page_frame(canvas, doc)
+            canvas.endForm()
+            self._page_form_ready = True
+        canvas.doForm(VOUCHER_PAGE_FORM)
+
+        canvas.setFont('Helvetica', 7)
+        canvas.setFillColor(colors.grey)
+        canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 0.55*inch, f"Page {doc.page}")
+
+
+def _format_datetime(value: Optional[datetime]) -> str:
+    return value.strftime("%Y-%m-%d %H:%M") if value else ""
+
+
+def _service_row(service: VoucherService) -> list:
+    """Cells of one service line (free text is escaped for Paragraph markup)."""
+    name = f"<b>{service.service_type}</b><br/>{escape(service.name)}"
+    if service.company:
+        name += f"<br/>{escape(service.company)}"
+
+    route = ""
+    if service.origin or service.destination:
+        route = f"{escape(service.origin)} &rarr; {escape(service.destination)}"
+    if service.route_guide:
+        route += f"<br/><i>Route guide: {escape(service.route_guide)}</i>"
+
+    return [
+        Paragraph(name, VOUCHER_CELL_STYLE),
+        Paragraph(route, VOUCHER_CELL_STYLE),
+        service.reference or "",
+        _format_datetime(service.starts_at),
+        _format_datetime(service.ends_at),
+        service.status,
+    ]
+
+
+def _voucher_flowables(order: VoucherOrder) -> list:
+    """Flowables of one voucher."""
+    customer_data = [
+        ['Order:', order.order_number],
+        ['Issued:', _format_datetime(order.created_at)],
+        ['Customer:', order.customer_name],
+    ]
+    if order.document_id:
+        customer_data.append(['Document:', order.document_id])
+    if order.email:
+        customer_data.append(['Email:', order.email])
+    if order.phone_number:
+        customer_data.append(['Phone:', order.phone_number])
+
+    flowables = [
+        Paragraph(f"Voucher {escape(order.order_number)}", VOUCHER_TITLE_STYLE),
+        Table(customer_data, colWidths=[1.2*inch, 4.5*inch], hAlign='LEFT', style=VOUCHER_CUSTOMER_TABLE_STYLE),
+        Spacer(1, 0.25*inch),
+    ]
+
+    if order.services:
+        flowables.append(Table(
+            [VOUCHER_SERVICE_HEADER, *(_service_row(service) for service in order.services)],
+            colWidths=VOUCHER_SERVICE_COL_WIDTHS,
+            repeatRows=1,
+            style=VOUCHER_SERVICE_TABLE_STYLE,
+        ))
+    else:
+        flowables.append(Paragraph("This order has no services.", VOUCHER_NOTE_STYLE))
+
+    flowables.append(Spacer(1, 0.2*inch))
+    flowables.append(KeepTogether(Table(
+        [['Total:', f"${float(order.total_sale_price):.2f}"]],
+        colWidths=[5.0*inch, 2.0*inch],
+        style=VOUCHER_TOTAL_TABLE_STYLE,
+    )))
+    return flowables
+
+
+def _render_voucher_pdf(orders: list[VoucherOrder], output_path: str) -> None:
+    """Render the vouchers into one PDF, each starting on a new page (runs in the voucher pool)."""
+    flowables = []
+    for index, order in enumerate(orders):
+        if index:
+            flowables.append(PageBreak())
+        flowables.extend(_voucher_flowables(order))
+    _VoucherDocTemplate(output_path).build(flowables)
+
+
+def _render_voucher_files(orders: list[VoucherOrder], output_dir: str) -> list[str]:
+    """Render one PDF per voucher into output_dir (runs in the voucher pool). Returns the paths."""
+    paths = []
+    for order in orders:
+        path = os.path.join(output_dir, f"voucher_{order.order_number}.pdf")
+        _render_voucher_pdf([order], path)
+        paths.append(path)
+    return paths
+
+
+def _zip_files(paths: list[str], output_path: str) -> None:
+    """Store the files in a ZIP archive (runs in the voucher pool)."""
+    # PDF streams are already compressed
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for path in paths:
+            archive.write(path, arcname=os.path.basename(path))
+
+
+async def render_vouchers(orders: list[VoucherOrder], format: str = "zip") -> ExportFile:
+    """
+    Render already loaded vouchers into a ZIP archive or one merged PDF.
+
+    For "zip", orders are split into chunks of VOUCHER_CHUNK_SIZE rendered in
+    parallel across the voucher process pool, one PDF per order. For "pdf",
+    all vouchers go into one document, each starting on a new page; it is
+    rendered as a single pool task since pages of one document cannot be
+    laid out in parallel.
+
+    Args:
+        orders: Vouchers to render
+        format: "zip" or "pdf"
+
+    Returns:
+        Temporary file with the ZIP archive or the merged PDF
+    """
+    if format == "pdf":
+        output = ExportFile(".pdf")
+        await run_in_voucher_pool(_render_voucher_pdf, orders, output.path)
+        return output
+
+    output = ExportFile(".zip")
+    chunk_size = settings.VOUCHER_CHUNK_SIZE
+    with tempfile.TemporaryDirectory(prefix="vouchers-") as parts_dir:
+        chunks = await asyncio.gather(*(
+            run_in_voucher_pool(_render_voucher_files, orders[start:start + chunk_size], parts_dir)
+            for start in range(0, len(orders), chunk_size)
+        ))
+        await run_in_voucher_pool(_zip_files, [path for chunk in chunks for path in chunk], output.path)
+    return output
+
+
+async def build_vouchers(db: AsyncSession, order_ids: list[int], format: str = "zip") -> ExportFile:
+    """
+    Render the vouchers of a batch of orders.
+
+    See render_vouchers for how each format is rendered.
+
+    Args:
+        db: Database session
+        order_ids: Orders to print
+        format: "zip" or "pdf"
+
+    Returns:
+        Temporary file with the ZIP archive or the merged PDF
+
+    Raises:
+        ValueError: If the format is unknown, the batch is invalid or an order does not exist
+    """
+    if format not in VOUCHER_FORMATS:
+        raise ValueError(f"Invalid voucher format '{format}'. Must be one of: {', '.join(VOUCHER_FORMATS)}")
+
+    orders = await load_voucher_orders(db, order_ids)
+    return await render_vouchers(orders, format)
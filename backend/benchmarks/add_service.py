@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: POST /orders/{order_id}/services end to end.
+
+Seeds an operator, a customer, a route and an order, then adds FLIGHT
+services (which touch the order totals, the daily rollup and the sales
+counters) through the API in-process, with the real get_db dependency.
+Reports latency percentiles and the number of COMMITs and SQL statements
+per request. Run it against a scratch database; the seeded rows are
+removed at the end.
+
+Usage:
+    python benchmarks/add_service.py --requests 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import delete, event
+
+from app.apis.dependencies import get_current_active_user
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models.customer import Customer
+from app.models.location import Location
+from app.models.order import Order
+from app.models.order_daily_stats import OrderDailyStats
+from app.models.popular_trip import PopularTrip
+from app.models.user import User
+
+BENCH_EMAIL = "bench-add-service@example.com"
+
+
+async def seed() -> tuple[User, int, int, int]:
+    """Insert the operator, customer, route and order. Returns (user, order id, origin id, destination id)."""
+    async with AsyncSessionLocal() as db:
+        user = User(email=BENCH_EMAIL, full_name="Benchmark Operator", hashed_password="x")
+        customer = Customer(full_name="Benchmark Customer", document_id="BENCH-ADD-SERVICE")
+        origin = Location(city="Bench Origin", country="Benchland")
+        destination = Location(city="Bench Destination", country="Benchland")
+        db.add_all([user, customer, origin, destination])
+        await db.flush()
+
+        order = Order(order_number="BENCH-ADD-SERVICE", user_id=user.id, customer_id=customer.id)
+        db.add(order)
+        await db.commit()
+        return user, order.id, origin.id, destination.id
+
+
+async def cleanup(user: User, order_id: int, origin_id: int, destination_id: int) -> None:
+    """Remove every seeded row (services cascade with the order)."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Order).where(Order.id == order_id))
+        await db.execute(delete(OrderDailyStats).where(OrderDailyStats.user_id == user.id))
+        await db.execute(delete(PopularTrip).where(PopularTrip.origin_location_id == origin_id))
+        await db.execute(delete(Customer).where(Customer.document_id == "BENCH-ADD-SERVICE"))
+        await db.execute(delete(Location).where(Location.id.in_([origin_id, destination_id])))
+        await db.execute(delete(User).where(User.id == user.id))
+        await db.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    counts = {"commits": 0, "statements": 0}
+
+    def on_commit(conn):
+        counts["commits"] += 1
+
+    def on_statement(conn, cursor, statement, parameters, context, executemany):
+        counts["statements"] += 1
+
+    print("🧾 Add-service benchmark")
+    print(f"Database: {settings.DATABASE_URL.split('@')[-1]}")
+    print(f"Requests: {args.requests}\n")
+
+    user, order_id, origin_id, destination_id = await seed()
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    event.listen(engine.sync_engine, "commit", on_commit)
+    event.listen(engine.sync_engine, "before_cursor_execute", on_statement)
+
+    payload = {
+        "order_id": order_id,
+        "service_type": "FLIGHT",
+        "name": "Benchmark Flight",
+        "cost_price": "100.00",
+        "sale_price": "120.00",
+        "origin_location_id": origin_id,
+        "destination_location_id": destination_id,
+    }
+    url = f"{settings.API_V1_PREFIX}/orders/{order_id}/services"
+
+    latencies = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Warm up the connection pool and statement caches
+            (await client.post(url, json=payload)).raise_for_status()
+            counts.update(commits=0, statements=0)
+
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = await client.post(url, json=payload)
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+    finally:
+        event.remove(engine.sync_engine, "commit", on_commit)
+        event.remove(engine.sync_engine, "before_cursor_execute", on_statement)
+        app.dependency_overrides.clear()
+        await cleanup(user, order_id, origin_id, destination_id)
+        await engine.dispose()
+
+    latencies.sort()
+    print(f"{'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8} {'commits/req':>12} {'statements/req':>15}")
+    print(
+        f"{statistics.median(latencies):>8.2f} "
+        f"{latencies[int(len(latencies) * 0.99) - 1]:>8.2f} "
+        f"{statistics.fmean(latencies):>8.2f} "
+        f"{counts['commits'] / args.requests:>12.2f} "
+        f"{counts['statements'] / args.requests:>15.2f}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
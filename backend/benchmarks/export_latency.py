@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API latency while an export renders.
+
+Seeds a batch of orders, then probes GET /health in-process at a fixed
+interval while the PDF and Excel exports run, once per render mode:
+
+- inline:  render on the event loop (the previous behaviour)
+- thread:  render in a thread pool
+- process: render in a process pool
+
+Reports p50/p99/max probe latency per mode. Run it against a scratch
+database; the seeded rows are removed at the end.
+
+Usage:
+    python benchmarks/export_latency.py --rows 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import delete, insert, select
+
+from app.core import workers
+from app.core.config import settings
+from app.core.file_cache import FileCache
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models.customer import Customer
+from app.models.order import Order
+from app.models.service import Service, ServiceType
+from app.services import export_service
+
+BENCH_DOCUMENT_ID = "BENCH-EXPORT-LATENCY"
+RENDER_MODES = ("inline",) + workers.RENDER_POOL_KINDS
+
+
+async def seed(rows: int) -> int:
+    """Insert one customer with `rows` single-service orders. Returns the customer id."""
+    async with AsyncSessionLocal() as db:
+        customer = Customer(full_name="Benchmark Customer", document_id=BENCH_DOCUMENT_ID)
+        db.add(customer)
+        await db.flush()
+
+        order_ids = (await db.execute(
+            insert(Order).returning(Order.id),
+            [
+                {
+                    "order_number": f"BENCH-{i:07d}",
+                    "customer_id": customer.id,
+                    "total_cost_price": Decimal("100.00"),
+                    "total_sale_price": Decimal("120.00"),
+                }
+                for i in range(rows)
+            ],
+        )).scalars().all()
+        await db.execute(insert(Service), [
+            {
+                "order_id": order_id,
+                "service_type": ServiceType.HOTEL,
+                "name": "Benchmark Hotel",
+                "cost_price": Decimal("100.00"),
+                "sale_price": Decimal("120.00"),
+            }
+            for order_id in order_ids
+        ])
+        await db.commit()
+        return customer.id
+
+
+async def cleanup() -> None:
+    """Remove the seeded customer and its orders (services cascade)."""
+    async with AsyncSessionLocal() as db:
+        customer_id = (await db.execute(
+            select(Customer.id).where(Customer.document_id == BENCH_DOCUMENT_ID)
+        )).scalar_one_or_none()
+        if customer_id is not None:
+            await db.execute(delete(Order).where(Order.customer_id == customer_id))
+            await db.execute(delete(Customer).where(Customer.id == customer_id))
+            await db.commit()
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    """
+    Request /health on a fixed schedule until stopped. Returns latencies in ms.
+
+    Latency is measured from when each request was due, not when it was
+    sent, so time spent waiting for a blocked event loop is counted.
+    """
+    latencies = []
+    due = time.perf_counter()
+    while not stop.is_set():
+        await client.get("/health")
+        latencies.append((time.perf_counter() - due) * 1000)
+        due += interval
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    return latencies
+
+
+async def run_exports() -> float:
+    """
+    Run the PDF and Excel exports once, as the endpoints do. Returns the elapsed seconds.
+
+    Each run uses an empty file cache, so both files are really rendered.
+    """
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        cache = FileCache(directory, max_bytes=1 << 40)
+        for format in ("pdf", "excel"):
+            async with AsyncSessionLocal() as db:
+                key = await export_service.export_cache_key(db, format)
+                await export_service.get_cached_export(db, key, cache)
+    return time.perf_counter() - start
+
+
+async def _render_inline(func, *args, **kwargs):
+    """Stand-in for run_in_render_pool that renders on the event loop."""
+    return func(*args, **kwargs)
+
+
+async def measure(mode: str, workers_count: int, interval: float) -> dict:
+    """Probe latency while the exports run in the given render mode."""
+    original = export_service.run_in_render_pool
+    pool = None
+    if mode == "inline":
+        export_service.run_in_render_pool = _render_inline
+    else:
+        pool = workers.create_render_pool(mode, workers_count)
+        workers._render_pool = pool
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            stop = asyncio.Event()
+            prober = asyncio.create_task(probe(client, stop, interval))
+            elapsed = await run_exports()
+            stop.set()
+            latencies = await prober
+    finally:
+        export_service.run_in_render_pool = original
+        if pool is not None:
+            workers.shutdown_render_pool()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "export_s": elapsed,
+        "probes": len(latencies),
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "max": latencies[-1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Orders to seed")
+    parser.add_argument("--workers", type=int, default=settings.EXPORT_RENDER_WORKERS, help="Pool size")
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between probes")
+    parser.add_argument("--modes", nargs="+", choices=RENDER_MODES, default=list(RENDER_MODES))
+    args = parser.parse_args()
+
+    print("⏱️  Export latency benchmark")
+    print(f"Database: {settings.DATABASE_URL.split('@')[-1]}\n")
+
+    try:
+        await cleanup()
+        print(f"🌱 Seeding {args.rows} orders...")
+        await seed(args.rows)
+
+        results = [await measure(mode, args.workers, args.interval) for mode in args.modes]
+
+        print(f"\n{'mode':<8} {'export s':>9} {'probes':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for r in results:
+            print(
+                f"{r['mode']:<8} {r['export_s']:>9.2f} {r['probes']:>7} "
+                f"{r['p50']:>8.2f} {r['p99']:>8.2f} {r['max']:>8.2f}"
+            )
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
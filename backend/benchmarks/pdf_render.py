@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF report render time and peak memory by row count.
+
+Renders the orders report from a synthetic spool of export rows (no
+database needed) at each size, every run in a fresh process so its peak
+RSS is measured on its own. With --legacy, also renders the previous
+single-Table layout for comparison (slow on large sizes).
+
+Usage:
+    python benchmarks/pdf_render.py --rows 10000 100000 500000 [--legacy]
+"""
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import resource
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services import export_service
+from app.services.export_service import ExportRow
+
+SPOOL_BATCH_SIZE = 1000
+
+
+def write_spool(path: str, rows: int) -> tuple:
+    """Write `rows` synthetic export rows to a spool file. Returns the summary tuple."""
+    created_at = datetime(2025, 1, 1, tzinfo=UTC)
+    with open(path, "wb") as f:
+        for start in range(0, rows, SPOOL_BATCH_SIZE):
+            batch = [
+                tuple(ExportRow(
+                    order_id=i,
+                    order_number=f"ORD-{i:07d}",
+                    created_at=created_at + timedelta(minutes=i),
+                    total_cost_price=Decimal("100.00"),
+                    total_sale_price=Decimal("120.00"),
+                    customer_name=f"Customer {i % 500}",
+                    document_id=None,
+                    email=None,
+                    phone_number=None,
+                    service_type="FLIGHT",
+                    service_name="Flight",
+                    departure_datetime=created_at + timedelta(days=30),
+                    arrival_datetime=None,
+                    origin="Caracas, Venezuela",
+                    destination="Bogota, Colombia",
+                    status="activo",
+                ))
+                for i in range(start, min(start + SPOOL_BATCH_SIZE, rows))
+            ]
+            pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+    return (rows, Decimal("100.00") * rows, Decimal("120.00") * rows)
+
+
+def render_legacy(spool_path: str, output_path: str) -> None:
+    """The previous layout: every row in one Table, all flowables built up front."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table
+
+    data = [export_service.PDF_ORDERS_HEADER]
+    data.extend(export_service._pdf_row_values(row) for row in export_service._read_spool(spool_path))
+    table = Table(data, colWidths=export_service.PDF_ORDERS_COL_WIDTHS)
+    table.setStyle(export_service.PDF_ORDERS_TABLE_STYLE)
+    SimpleDocTemplate(output_path, pagesize=A4).build([table])
+
+
+def run_once(mode: str, rows: int, queue: multiprocessing.Queue) -> None:
+    """Render one report in this (fresh) process and report time, RSS and size."""
+    with tempfile.TemporaryDirectory() as tmp:
+        spool_path = os.path.join(tmp, "rows.spool")
+        output_path = os.path.join(tmp, "report.pdf")
+        summary = write_spool(spool_path, rows)
+        baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        start = time.perf_counter()
+        if mode == "legacy":
+            render_legacy(spool_path, output_path)
+        else:
+            export_service._render_pdf(
+                spool_path, output_path, summary, None, None, None, None, settings.EXPORT_PDF_TABLE_ROWS
+            )
+        elapsed = time.perf_counter() - start
+
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        queue.put((elapsed, peak_kb / 1024, (peak_kb - baseline_kb) / 1024, os.path.getsize(output_path)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--legacy", action="store_true", help="Also render the single-Table layout")
+    args = parser.parse_args()
+
+    modes = ["chunked"] + (["legacy"] if args.legacy else [])
+    print("📄 PDF render benchmark")
+    print(f"Rows per table chunk: {settings.EXPORT_PDF_TABLE_ROWS}\n")
+    print(f"{'mode':<8} {'rows':>8} {'render s':>9} {'peak RSS MB':>12} {'render MB':>10} {'PDF MB':>8}")
+
+    context = multiprocessing.get_context("spawn")
+    for rows in args.rows:
+        for mode in modes:
+            queue = context.Queue()
+            process = context.Process(target=run_once, args=(mode, rows, queue))
+            process.start()
+            elapsed, peak_mb, render_mb, size = queue.get()
+            process.join()
+            print(f"{mode:<8} {rows:>8} {elapsed:>9.2f} {peak_mb:>12.1f} {render_mb:>10.1f} {size / 2**20:>8.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
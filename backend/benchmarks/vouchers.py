@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: voucher ZIP render time by pool kind.
+
+Renders a ZIP of synthetic vouchers (no database needed) three ways:
+inline in one process, chunked across a thread pool, and chunked across a
+process pool (what build_vouchers uses). reportlab layout is pure Python,
+so threads are serialized by the GIL and only the process pool scales;
+its speed-up is bounded by the CPUs available to the benchmark. Each pool
+is warmed up before timing so worker start-up is not counted.
+
+Usage:
+    python benchmarks/vouchers.py --orders 100 500 [--workers 4] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Executor
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core import workers
+from app.core.config import settings
+from app.services import voucher_service
+from app.services.voucher_service import VoucherOrder, VoucherService
+
+
+def make_orders(count: int) -> list[VoucherOrder]:
+    """Build `count` synthetic vouchers, each with a flight and a hotel."""
+    created_at = datetime(2025, 1, 1, tzinfo=UTC)
+    return [
+        VoucherOrder(
+            order_number=f"ORD-{i:07d}",
+            created_at=created_at + timedelta(minutes=i),
+            customer_name=f"Customer {i % 500}",
+            document_id=f"V-{10000000 + i}",
+            email=f"customer{i}@example.com",
+            phone_number="+58 412 0000000",
+            total_sale_price=Decimal("450.00"),
+            services=(
+                VoucherService(
+                    service_type="FLIGHT",
+                    name="Flight",
+                    status="activo",
+                    company="Avior",
+                    reference=f"PNR{i:05d}",
+                    origin="Caracas, Venezuela",
+                    destination="Bogota, Cundinamarca, Colombia",
+                    route_guide="CCS - BOG",
+                    starts_at=created_at + timedelta(days=30),
+                    ends_at=created_at + timedelta(days=30, hours=2),
+                ),
+                VoucherService(
+                    service_type="HOTEL",
+                    name="Hotel",
+                    status="activo",
+                    company="Hotel Tequendama",
+                    reference=f"RES-{i:06d}",
+                    origin="Bogota, Cundinamarca, Colombia",
+                    destination="Bogota, Cundinamarca, Colombia",
+                    route_guide=None,
+                    starts_at=created_at + timedelta(days=30, hours=6),
+                    ends_at=created_at + timedelta(days=33),
+                ),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def render_inline(orders: list[VoucherOrder]) -> None:
+    """Render and zip every voucher in this process, one after another."""
+    with tempfile.TemporaryDirectory(prefix="vouchers-") as tmp:
+        paths = voucher_service._render_voucher_files(orders, tmp)
+        voucher_service._zip_files(paths, os.path.join(tmp, "vouchers.zip"))
+
+
+def render_pooled(pool: Executor, orders: list[VoucherOrder]) -> None:
+    """Render the ZIP through render_vouchers with `pool` as the voucher pool."""
+    workers._voucher_pool = pool
+    output = asyncio.run(voucher_service.render_vouchers(orders, "zip"))
+    os.unlink(output.path)
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Return the fastest of `repeat` timed calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("🎫 Voucher render benchmark")
+    print(f"CPUs: {os.cpu_count()}, workers: {args.workers}, vouchers per chunk: {settings.VOUCHER_CHUNK_SIZE}\n")
+    print(f"{'mode':<8} {'orders':>7} {'render s':>9} {'vouchers/s':>11} {'speed-up':>9}")
+
+    pools = {kind: workers.create_render_pool(kind, args.workers) for kind in workers.RENDER_POOL_KINDS}
+    try:
+        for pool in pools.values():
+            render_pooled(pool, make_orders(settings.VOUCHER_CHUNK_SIZE * args.workers))
+
+        for count in args.orders:
+            orders = make_orders(count)
+            inline = best_of(args.repeat, render_inline, orders)
+            results = [("inline", inline)] + [
+                (kind, best_of(args.repeat, render_pooled, pool, orders)) for kind, pool in pools.items()
+            ]
+            for mode, elapsed in results:
+                print(f"{mode:<8} {count:>7} {elapsed:>9.2f} {count / elapsed:>11.0f} {inline / elapsed:>8.2f}x", flush=True)
+    finally:
+        workers._voucher_pool = None
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Script to rebuild the order_daily_stats rollup table from existing orders."""
+
+import asyncio
+import sys
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.services import daily_stats_service
+
+
+async def main():
+    """Backfill the daily sales rollup."""
+    print("📊 Rebuilding order_daily_stats...")
+    print(f"Database: {settings.DATABASE_URL.split('@')[-1]}\n")
+
+    try:
+        async with AsyncSessionLocal() as session:
+            rows = await daily_stats_service.rebuild_daily_stats(session)
+        print(f"✅ Rollup rebuilt: {rows} day/operator rows")
+    except Exception as e:
+        print(f"❌ Error rebuilding rollup: {e}")
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Script to repair popular_trips and users sales counters from the services table."""
+
+import asyncio
+import sys
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.services import order_service
+
+
+async def main():
+    """Reconcile sales counters with the services actually sold."""
+    print("🔁 Reconciling sales counters...")
+    print(f"Database: {settings.DATABASE_URL.split('@')[-1]}\n")
+
+    try:
+        async with AsyncSessionLocal() as session:
+            repaired = await order_service.reconcile_sales_counters(session)
+        print(f"✅ Popular trips repaired: {repaired['popular_trips']}")
+        print(f"✅ Users repaired: {repaired['users']}")
+    except Exception as e:
+        print(f"❌ Error reconciling counters: {e}")
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
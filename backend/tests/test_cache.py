@@ -0,0 +1,46 @@
+from app.core import cache as cache_module
+from app.core.cache import TTLCache, cached
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == (True, 1)
+    assert cache.get("b") == (False, None)
+    assert cache.get("c") == (True, 3)
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("key", "value")
+
+    now[0] += 29
+    assert cache.get("key") == (True, "value")
+    now[0] += 2
+    assert cache.get("key") == (False, None)
+    assert cache.stats()["entries"] == 0
+
+
+async def test_cached_recomputes_after_data_version_bump():
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = []
+
+    @cached("demo", cache=cache)
+    async def compute(db, year, types=None):
+        calls.append(year)
+        return year * 2
+
+    assert await compute(object(), 2024, types=["daily"]) == 4048
+    assert await compute(object(), 2024, types=["daily"]) == 4048
+    assert calls == [2024]
+
+    cache.bump_data_version()
+    assert await compute(object(), 2024, types=["daily"]) == 4048
+    assert calls == [2024, 2024]
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.core.coalesce import SingleFlight, coalesced
+
+
+async def test_concurrent_identical_calls_run_once():
+    group = SingleFlight()
+    calls = []
+
+    @coalesced("demo", group=group)
+    async def compute(db, year):
+        calls.append(year)
+        await asyncio.sleep(0.01)
+        return {"year": year}
+
+    results = await asyncio.gather(*(compute(None, 2024) for _ in range(5)), compute(None, 2025))
+
+    assert calls == [2024, 2025]
+    assert results[:5] == [{"year": 2024}] * 5
+    assert group.stats() == {"calls": 6, "executions": 2, "deduplicated": 4, "in_flight": 0}
+
+
+async def test_calls_after_a_write_do_not_join_older_computations():
+    group = SingleFlight()
+    cache = TTLCache(maxsize=10, ttl=60)
+    started = asyncio.Event()
+
+    @coalesced("demo", group=group, cache=cache)
+    async def compute(db):
+        version = cache.data_version
+        started.set()
+        await asyncio.sleep(0.01)
+        return version
+
+    before = asyncio.create_task(compute(None))
+    await started.wait()
+    cache.bump_data_version()
+    after = await compute(None)
+
+    assert (await before, after) == (0, 1)
+    assert group.executions == 2
+
+
+async def test_errors_reach_every_waiter():
+    group = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        group.do("key", fail), group.do("key", fail), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert group.executions == 1
+
+
+async def test_follower_takes_over_when_leader_is_cancelled():
+    group = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(group.do("key", slow))
+    await started.wait()
+    follower = asyncio.create_task(group.do("key", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await follower == "done"
+    assert group.executions == 2
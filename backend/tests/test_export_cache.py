@@ -0,0 +1,130 @@
+import os
+
+import httpx
+from sqlalchemy import select
+
+from app.apis.dependencies import get_current_superuser
+from app.core.file_cache import FileCache
+from app.db.session import get_db
+from app.main import app
+from app.models.customer import Customer
+from app.models.location import Location
+from app.models.service import Service
+from app.services import export_service
+from tests.test_export_service import seed_export_orders
+
+
+def write_file(path, size: int, mtime: int) -> str:
+    """Create a file of the given size and modification time."""
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_file_cache_evicts_least_recently_used_by_size(tmp_path):
+    cache = FileCache(str(tmp_path / "cache"), max_bytes=25)
+    staging = tmp_path / "staging"
+    staging.mkdir()
+
+    first = cache.put("a", ".bin", write_file(staging / "a", 10, 1000))
+    os.utime(first, (1000, 1000))
+    second = cache.put("b", ".bin", write_file(staging / "b", 10, 2000))
+    os.utime(second, (2000, 2000))
+
+    assert cache.get("a", ".bin") == first  # Touch: "b" is now the oldest
+    cache.put("c", ".bin", write_file(staging / "c", 10, 3000))
+
+    assert cache.get("b", ".bin") is None
+    assert cache.get("a", ".bin") is not None
+    assert cache.get("c", ".bin") is not None
+    assert cache.stats()["bytes"] == 20
+
+
+def test_abandoned_staged_files_are_swept(tmp_path):
+    cache = FileCache(str(tmp_path / "cache"), max_bytes=1024)
+    cache.incoming.mkdir(parents=True)
+    abandoned = write_file(cache.incoming / "abandoned.xlsx", 10, 1000)
+    in_progress = cache.incoming / "in-progress.xlsx"
+    in_progress.write_bytes(b"x")
+
+    assert cache.sweep_incoming() == 1
+    assert not os.path.exists(abandoned)
+    assert in_progress.exists()  # Recent: may belong to another worker's put()
+
+    # Evictions sweep too
+    write_file(cache.incoming / "abandoned.pdf", 10, 1000)
+    cache.evict()
+    assert list(cache.incoming.iterdir()) == [in_progress]
+
+
+async def test_export_is_built_once_per_data_version(db, tmp_path, monkeypatch, statements):
+    await seed_export_orders(db)
+    cache = FileCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    builds = []
+    build_excel, suffix = export_service.CACHED_EXPORT_FORMATS["excel"]
+
+    async def counting_build(*args):
+        builds.append(args[1:])
+        return await build_excel(*args)
+
+    monkeypatch.setitem(export_service.CACHED_EXPORT_FORMATS, "excel", (counting_build, suffix))
+
+    statements.clear()
+    key = await export_service.export_cache_key(db, "excel", status="activo")
+    # Index lookups only: no row counts over the exported tables
+    assert len(statements) == 1 and "count(" not in statements[0]
+    path = await export_service.get_cached_export(db, key, cache)
+    assert await export_service.export_cache_key(db, "excel", status="activo") == key
+    assert await export_service.get_cached_export(db, key, cache) == path
+    assert len(builds) == 1
+
+    # Editing a service changes the data version
+    service = await db.scalar(select(Service).where(Service.name == "Bus"))
+    service.name = "Night bus"
+    await db.commit()
+    edited = await export_service.export_cache_key(db, "excel", status="activo")
+    assert edited != key
+
+    # So does deleting one (counted by the deletion triggers)
+    await db.delete(service)
+    await db.commit()
+    deleted = await export_service.export_cache_key(db, "excel", status="activo")
+    assert deleted not in (key, edited)
+
+    # Customer and location details are exported too
+    customer = await db.scalar(select(Customer))
+    customer.phone_number = "+58 412 0000000"
+    await db.commit()
+    customer_edited = await export_service.export_cache_key(db, "excel", status="activo")
+    assert customer_edited != deleted
+
+    location = await db.scalar(select(Location).where(Location.city == "Caracas"))
+    location.city = "Caracas DC"
+    await db.commit()
+    assert await export_service.export_cache_key(db, "excel", status="activo") != customer_edited
+
+
+async def test_repeat_download_is_revalidated_with_etag(db, session_factory, tmp_path, monkeypatch):
+    await seed_export_orders(db)
+    monkeypatch.setattr(export_service.export_file_cache, "directory", tmp_path)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_superuser] = lambda: None
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/api/v1/exports/pdf")
+            etag = first.headers["etag"]
+            cached = await client.get("/api/v1/exports/pdf", headers={"If-None-Match": etag})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert first.content.startswith(b"%PDF")
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
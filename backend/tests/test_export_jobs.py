@@ -0,0 +1,108 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import func, update
+
+from app.models.order import Order
+from app.services import export_job_service
+from app.services.export_job_service import ExportJobManager
+from tests.test_export_service import seed_export_orders
+
+
+async def test_job_reports_progress_and_is_reused(db, session_factory):
+    await seed_export_orders(db)
+    jobs = ExportJobManager(session_factory=session_factory)
+
+    job = await jobs.submit("excel", status="activo")
+    await jobs.join()
+
+    assert job.status == "completed"
+    assert job.progress.phase == "done"
+    assert job.progress.total_rows == job.progress.rows_processed == 2
+    assert os.path.getsize(job.file.path) > 0
+    assert job.filename.endswith(".xlsx")
+
+    # Same request while the data is unchanged reuses the finished job
+    assert await jobs.submit("excel", status="activo") is job
+    assert await jobs.submit("pdf", status="activo") is not job
+
+    # A write made outside the order services (e.g. by a script) also counts
+    await db.execute(update(Order).values(updated_at=func.now()))
+    await db.commit()
+    assert await jobs.submit("excel", status="activo") is not job
+    await jobs.join()
+
+
+async def test_jobs_are_bounded_and_expire(db, session_factory, monkeypatch):
+    await seed_export_orders(db)
+    release = asyncio.Event()
+    _, prefix, extension, media_type = export_job_service.JOB_FORMATS["excel"]
+
+    async def blocking_builder(db, progress, **filters):
+        await release.wait()
+        return await export_job_service._build_excel_file(db, progress, **filters)
+
+    monkeypatch.setitem(
+        export_job_service.JOB_FORMATS, "excel", (blocking_builder, prefix, extension, media_type)
+    )
+    jobs = ExportJobManager(session_factory=session_factory, max_concurrency=1, ttl=0)
+
+    first = await jobs.submit("excel", service_type="BUS")
+    second = await jobs.submit("excel", service_type="FLIGHT")
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+    assert (first.status, second.status) == ("running", "pending")
+
+    release.set()
+    await jobs.join()
+    assert (first.status, second.status) == ("completed", "completed")
+
+    # ttl=0: finished jobs are dropped on the next lookup, files with them
+    path = first.file.path
+    assert jobs.get(first.id) is None
+    del first
+    await asyncio.sleep(0)
+    assert not os.path.exists(path)
+
+
+async def test_unknown_format_is_rejected(session_factory):
+    jobs = ExportJobManager(session_factory=session_factory)
+    with pytest.raises(ValueError):
+        await jobs.submit("docx")
+
+
+async def test_failed_job_hides_exception_details(db, session_factory, monkeypatch, caplog):
+    _, prefix, extension, media_type = export_job_service.JOB_FORMATS["excel"]
+
+    async def failing_builder(db, progress, **filters):
+        raise RuntimeError("connection to host=db.internal failed")
+
+    monkeypatch.setitem(
+        export_job_service.JOB_FORMATS, "excel", (failing_builder, prefix, extension, media_type)
+    )
+    jobs = ExportJobManager(session_factory=session_factory)
+
+    job = await jobs.submit("excel")
+    await jobs.join()
+
+    assert (job.status, job.error) == ("failed", "Export failed")
+    assert "db.internal" in caplog.text
+
+
+async def test_idle_manager_purges_expired_jobs(db, session_factory):
+    await seed_export_orders(db)
+    jobs = ExportJobManager(session_factory=session_factory, ttl=0)
+    jobs.start_purging(interval=0.01)
+
+    job = await jobs.submit("excel", service_type="BUS")
+    await jobs.join()
+    path = job.file.path
+    del job
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+
+    # No lookup was made: the periodic purge dropped the job and its file
+    assert not jobs._jobs
+    assert not os.path.exists(path)
+    await jobs.shutdown()
@@ -0,0 +1,285 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import select
+
+from app.core import workers
+from app.core.config import settings
+from app.core.file_cache import FileCache
+from app.core.workers import RENDER_POOL_KINDS
+from app.models.customer import Customer
+from app.models.location import Location
+from app.models.order import Order
+from app.models.service import Service, ServiceType
+from app.services import export_service
+
+
+async def seed_export_orders(db) -> None:
+    """Insert two orders: a flight plus a cancelled hotel, and a single bus trip."""
+    customer = Customer(full_name="Ana Perez", document_id="V-1", email="ana@example.com")
+    origin = Location(city="Caracas", state="", country="Venezuela")
+    destination = Location(city="Bogota", state="Cundinamarca", country="Colombia")
+    db.add_all([customer, origin, destination])
+    await db.flush()
+
+    first = Order(
+        order_number="ORD-1", customer_id=customer.id,
+        total_cost_price=Decimal("300.00"), total_sale_price=Decimal("360.00"),
+    )
+    second = Order(
+        order_number="ORD-2", customer_id=customer.id,
+        total_cost_price=Decimal("40.00"), total_sale_price=Decimal("50.00"),
+    )
+    db.add_all([first, second])
+    await db.flush()
+
+    db.add_all([
+        Service(
+            order_id=first.id, service_type=ServiceType.FLIGHT, name="Flight",
+            cost_price=Decimal("200.00"), sale_price=Decimal("240.00"),
+            origin_location_id=origin.id, destination_location_id=destination.id,
+        ),
+        Service(
+            order_id=first.id, service_type=ServiceType.HOTEL, name="Hotel", status="cancelado",
+            cost_price=Decimal("100.00"), sale_price=Decimal("120.00"),
+        ),
+        Service(
+            order_id=second.id, service_type=ServiceType.BUS, name="Bus",
+            cost_price=Decimal("40.00"), sale_price=Decimal("50.00"),
+        ),
+    ])
+    await db.commit()
+
+
+async def stream_rows(session_factory, **filters) -> list:
+    """Collect every row streamed for the given export filters."""
+    return [
+        row
+        async for batch in export_service.stream_export_rows(session_factory=session_factory, **filters)
+        for row in batch
+    ]
+
+
+async def cached_export(db, tmp_path, format: str, **filters):
+    """Build an export like the endpoints do, through a file cache in tmp_path."""
+    key = await export_service.export_cache_key(db, format, **filters)
+    cache = FileCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    return await export_service.get_cached_export(db, key, cache)
+
+
+async def test_export_filters_run_in_sql(db, session_factory, statements):
+    await seed_export_orders(db)
+    statements.clear()
+
+    rows = await stream_rows(session_factory, status="ACTIVO", service_type="flight")
+
+    assert len(statements) == 1
+    assert [(row.order_number, row.service_type, row.status) for row in rows] == [
+        ("ORD-1", "FLIGHT", "activo"),
+    ]
+    assert rows[0].origin == "Caracas, Venezuela"
+    assert rows[0].destination == "Bogota, Cundinamarca, Colombia"
+    assert rows[0].total_profit == Decimal("60.00")
+
+    assert await stream_rows(session_factory, service_type="unknown") == []
+
+
+async def test_delta_export_returns_rows_changed_after_cursor(db, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_DELTA_LAG_SECONDS", 0)
+    await seed_export_orders(db)
+
+    initial = await export_service.fetch_export_delta(db)
+    assert len(initial.rows) == 3
+    assert initial.next_cursor == max(row.updated_at for row in initial.rows)
+
+    unchanged = await export_service.fetch_export_delta(db, since=initial.next_cursor)
+    assert unchanged.rows == []
+    assert unchanged.next_cursor == initial.next_cursor
+
+    hotel = (await db.execute(select(Service).where(Service.name == "Hotel"))).scalar_one()
+    hotel.name = "Hotel Tequendama"
+    await db.commit()
+
+    delta = await export_service.fetch_export_delta(db, since=initial.next_cursor)
+    assert [(row.service_id, row.service_name) for row in delta.rows] == [(hotel.id, "Hotel Tequendama")]
+    assert delta.next_cursor > initial.next_cursor
+
+    # A change to the order resends all of its services (they carry its totals)
+    order = (await db.execute(select(Order).where(Order.order_number == "ORD-1"))).scalar_one()
+    order.total_sale_price = Decimal("400.00")
+    await db.commit()
+
+    delta = await export_service.fetch_export_delta(db, since=delta.next_cursor)
+    assert [row.service_name for row in delta.rows] == ["Flight", "Hotel Tequendama"]
+    assert {row.total_sale_price for row in delta.rows} == {Decimal("400.00")}
+
+
+async def test_delta_cursor_stays_behind_recent_changes(db):
+    await seed_export_orders(db)
+
+    delta = await export_service.fetch_export_delta(db)
+
+    # Changes within EXPORT_DELTA_LAG_SECONDS may still be committing elsewhere
+    assert delta.next_cursor < min(row.updated_at for row in delta.rows)
+    again = await export_service.fetch_export_delta(db, since=delta.next_cursor)
+    assert len(again.rows) == 3
+
+
+async def test_excel_export_has_one_row_per_matching_service(db, tmp_path):
+    await seed_export_orders(db)
+
+    path = await cached_export(db, tmp_path, "excel", status="activo")
+
+    sheet = load_workbook(path).active
+    values = list(sheet.iter_rows(min_row=2, values_only=True))
+    assert [(row[0], row[5], row[9], row[10]) for row in values] == [
+        ("ORD-1", "FLIGHT", "Caracas, Venezuela", "Bogota, Cundinamarca, Colombia"),
+        ("ORD-2", "BUS", None, None),
+    ]
+    # Widths come from the longest value (or header) per column
+    assert sheet.column_dimensions["A"].width == len("Order Number") + 2
+    assert sheet.column_dimensions["K"].width == len("Bogota, Cundinamarca, Colombia") + 2
+
+
+async def test_excel_export_file_is_removed_when_released(db, statements):
+    await seed_export_orders(db)
+    statements.clear()
+
+    export_file = await export_service.build_orders_excel(db)
+    path = export_file.path
+    # Column widths are measured while spooling, not with a second query
+    assert len(statements) == 1
+    assert os.path.getsize(path) == export_file.size > 0
+
+    del export_file
+    assert not os.path.exists(path)
+
+
+async def test_pdf_export_renders_filtered_rows(db, tmp_path):
+    await seed_export_orders(db)
+
+    path = await cached_export(db, tmp_path, "pdf", service_type="HOTEL")
+
+    assert path.read_bytes().startswith(b"%PDF")
+
+
+async def test_pdf_report_counts_each_order_once_and_chunks_rows(db, tmp_path, monkeypatch):
+    await seed_export_orders(db)
+    monkeypatch.setattr(export_service.settings, "EXPORT_PDF_TABLE_ROWS", 2)
+    tables = []
+    original = export_service._iter_orders_tables
+
+    def recording_tables(spool_path, chunk_rows):
+        for table in original(spool_path, chunk_rows):
+            tables.append(table)
+            yield table
+
+    monkeypatch.setattr(export_service, "_iter_orders_tables", recording_tables)
+
+    summary = await export_service._export_summary(db, export_service.build_export_query())
+    path = await cached_export(db, tmp_path, "pdf")
+
+    assert summary == (2, Decimal("340.00"), Decimal("410.00"))
+    assert path.read_bytes().startswith(b"%PDF")
+    # Three rows in chunks of two, each chunk repeating the header row
+    assert [table._nrows for table in tables] == [3, 2]
+
+
+@pytest.fixture(params=RENDER_POOL_KINDS)
+def render_pool(request, monkeypatch):
+    """Render exports in a dedicated pool of each kind."""
+    pool = workers.create_render_pool(request.param, 1)
+    monkeypatch.setattr(workers, "_render_pool", pool)
+    yield request.param
+    pool.shutdown(wait=True)
+
+
+async def test_exports_render_in_worker_pool(db, tmp_path, render_pool):
+    await seed_export_orders(db)
+
+    excel_path = await cached_export(db, tmp_path, "excel", service_type="BUS")
+    pdf = (await cached_export(db, tmp_path, "pdf", service_type="BUS")).read_bytes()
+
+    sheet = load_workbook(excel_path).active
+    assert [row[0] for row in sheet.iter_rows(min_row=2, values_only=True)] == ["ORD-2"]
+    assert pdf.startswith(b"%PDF")
+
+
+async def test_csv_export_streams_filtered_rows(db, session_factory):
+    await seed_export_orders(db)
+
+    chunks = [
+        chunk async for chunk in export_service.iter_orders_csv(
+            status="activo", session_factory=session_factory
+        )
+    ]
+
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert [(row["order_number"], row["service_type"]) for row in rows] == [
+        ("ORD-1", "FLIGHT"),
+        ("ORD-2", "BUS"),
+    ]
+    assert rows[0]["total_sale_price"] == "360.00"
+    assert rows[0]["total_profit"] == "60.00"
+    assert rows[1]["origin"] == ""
+
+
+async def test_ndjson_export_streams_one_object_per_row(db, session_factory):
+    await seed_export_orders(db)
+
+    chunks = [
+        chunk async for chunk in export_service.iter_orders_ndjson(
+            service_type="HOTEL", session_factory=session_factory
+        )
+    ]
+
+    lines = "".join(chunks).splitlines()
+    assert len(lines) == 1
+    row = json.loads(lines[0])
+    assert row["service_name"] == "Hotel"
+    assert row["status"] == "cancelado"
+    assert row["total_cost_price"] == "300.00"
+    assert datetime.fromisoformat(row["created_at"]).tzinfo is not None
+
+
+async def test_parquet_export_writes_typed_row_groups(db, session_factory):
+    pq = pytest.importorskip("pyarrow.parquet")
+    await seed_export_orders(db)
+
+    chunks = [
+        chunk async for chunk in export_service.iter_orders_parquet(
+            session_factory=session_factory, row_group_size=1
+        )
+    ]
+
+    parquet_file = pq.ParquetFile(BytesIO(b"".join(chunks)))
+    assert parquet_file.metadata.num_row_groups == 3
+    assert len(chunks) == 4  # One chunk per row group, then the footer
+
+    table = parquet_file.read()
+    assert str(table.schema.field("total_sale_price").type) == "decimal128(10, 2)"
+    assert str(table.schema.field("created_at").type) == "timestamp[us, tz=UTC]"
+    assert table.column("total_profit").to_pylist() == [Decimal("60.00"), Decimal("60.00"), Decimal("10.00")]
+
+
+async def test_arrow_export_matches_filtered_rows(db, session_factory):
+    pa = pytest.importorskip("pyarrow")
+    await seed_export_orders(db)
+
+    chunks = [
+        chunk async for chunk in export_service.iter_orders_arrow(
+            service_type="FLIGHT", session_factory=session_factory
+        )
+    ]
+
+    table = pa.ipc.open_file(pa.BufferReader(b"".join(chunks))).read_all()
+    assert table.column("order_number").to_pylist() == ["ORD-1"]
+    assert table.column("origin").to_pylist() == ["Caracas, Venezuela"]
+    assert table.column("departure_datetime").to_pylist() == [None]
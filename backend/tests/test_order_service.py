@@ -0,0 +1,408 @@
+import asyncio
+import re
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.models.customer import Customer
+from app.models.location import Location
+from app.models.order import Order
+from app.models.order_daily_stats import OrderDailyStats
+from app.models.popular_trip import PopularTrip
+from app.models.service import Service, ServiceType
+from app.models.user import User
+from app.schemas import order as order_schemas
+from app.schemas import service as service_schemas
+from app.services import daily_stats_service, order_service, stats_service
+
+
+async def create_operator_and_customer(db) -> tuple[User, Customer]:
+    """Insert an operator and a customer to sell to."""
+    user = User(email="operator@example.com", full_name="Operator", hashed_password="x")
+    customer = Customer(full_name="Customer")
+    db.add_all([user, customer])
+    await db.commit()
+    return user, customer
+
+
+def service_create(order_id: int, cost: str, sale: str, **fields) -> service_schemas.ServiceCreate:
+    """Build a ServiceCreate payload with the given prices."""
+    return service_schemas.ServiceCreate(
+        order_id=order_id,
+        service_type=fields.pop("service_type", ServiceType.HOTEL),
+        name=fields.pop("name", "Hotel"),
+        cost_price=Decimal(cost),
+        sale_price=Decimal(sale),
+        **fields,
+    )
+
+
+async def rollup_rows(db) -> list[tuple]:
+    """Current rollup contents as comparable tuples."""
+    result = await db.execute(
+        select(
+            OrderDailyStats.day,
+            OrderDailyStats.user_id,
+            OrderDailyStats.order_count,
+            OrderDailyStats.total_cost,
+            OrderDailyStats.total_sale,
+            OrderDailyStats.total_profit,
+        ).order_by(OrderDailyStats.day, OrderDailyStats.user_id)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def test_mutations_keep_daily_rollup_in_sync(db):
+    user, customer = await create_operator_and_customer(db)
+    order_data = order_schemas.OrderCreate(customer_id=customer.id)
+
+    order = await order_service.create_order(db, order_data, user)
+    other = await order_service.create_order(db, order_data, user)
+    hotel = await order_service.add_service_to_order(db, service_create(order.id, "100", "150"), user)
+    await order_service.add_service_to_order(db, service_create(order.id, "50", "60"), user)
+    await order_service.add_service_to_order(db, service_create(other.id, "10", "25"), user)
+    await order_service.update_service(
+        db, hotel.id, service_schemas.ServiceUpdate(sale_price=Decimal("170")), user
+    )
+    await order_service.delete_service(db, hotel.id)
+    await order_service.delete_order(db, other.id)
+
+    incremental = await rollup_rows(db)
+    await daily_stats_service.rebuild_daily_stats(db)
+    rebuilt = await rollup_rows(db)
+
+    assert incremental == rebuilt
+    day, user_id, order_count, cost, sale, profit = rebuilt[0]
+    assert (user_id, order_count) == (user.id, 1)
+    assert (cost, sale, profit) == (Decimal("50.00"), Decimal("60.00"), Decimal("10.00"))
+
+
+async def test_rebuild_waits_for_in_flight_rollup_writes(db, session_factory):
+    user, customer = await create_operator_and_customer(db)
+
+    async with session_factory() as writer, session_factory() as maintenance:
+        seller = await writer.get(User, user.id)
+        order_data = order_schemas.OrderCreate(customer_id=customer.id)
+        order = await order_service.create_order(writer, order_data, seller)
+
+        # The writer has upserted its rollup row but not committed yet
+        rebuild = asyncio.create_task(daily_stats_service.rebuild_daily_stats(maintenance))
+        await asyncio.sleep(0.2)
+        assert not rebuild.done()
+
+        await writer.commit()
+        assert await rebuild == 1
+
+    day = daily_stats_service.rollup_day(order.created_at)
+    assert [row[:3] for row in await rollup_rows(db)] == [(day, user.id, 1)]
+
+
+async def test_order_totals_are_updated_in_sql_without_loading_services(db, session_factory, statements):
+    user, customer = await create_operator_and_customer(db)
+    order = await order_service.create_order(db, order_schemas.OrderCreate(customer_id=customer.id), user)
+    await db.commit()
+    created_at = order.updated_at
+
+    # Concurrent sales on the same order add up instead of overwriting each other
+    async def add_service(cost: str, sale: str):
+        async with session_factory() as session:
+            seller = await session.get(User, user.id)
+            await order_service.add_service_to_order(session, service_create(order.id, cost, sale), seller)
+            await session.commit()
+
+    await asyncio.gather(*(add_service("10", "15") for _ in range(8)))
+
+    statements.clear()
+    await order_service.add_service_to_order(db, service_create(order.id, "20", "30"), user)
+
+    assert (order.total_cost_price, order.total_sale_price) == (Decimal("100.00"), Decimal("150.00"))
+    assert not any("WHERE services.order_id" in statement for statement in statements)
+
+    sums = (await db.execute(
+        select(func.sum(Service.cost_price), func.sum(Service.sale_price)).where(Service.order_id == order.id)
+    )).one()
+    stored = (await db.execute(
+        select(Order.total_cost_price, Order.total_sale_price, Order.updated_at).where(Order.id == order.id)
+    )).one()
+    assert tuple(sums) == (stored.total_cost_price, stored.total_sale_price)
+    assert stored.updated_at > created_at
+
+
+async def route_count(db, origin: Location, destination: Location) -> int:
+    """Current PopularTrip counter for a route (0 when missing)."""
+    result = await db.execute(
+        select(PopularTrip.sales_count).where(
+            PopularTrip.origin_location_id == origin.id,
+            PopularTrip.destination_location_id == destination.id,
+        )
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def test_sales_counters_follow_updates_and_deletes(db):
+    user, customer = await create_operator_and_customer(db)
+    caracas = Location(country="Venezuela", city="Caracas")
+    maracaibo = Location(country="Venezuela", city="Maracaibo")
+    db.add_all([caracas, maracaibo])
+    await db.commit()
+    order = await order_service.create_order(
+        db, order_schemas.OrderCreate(customer_id=customer.id), user
+    )
+    flight = service_create(
+        order.id,
+        "100",
+        "120",
+        service_type=ServiceType.FLIGHT,
+        name="Flight",
+        origin_location_id=caracas.id,
+        destination_location_id=maracaibo.id,
+    )
+
+    first = await order_service.add_service_to_order(db, flight, user)
+    second = await order_service.add_service_to_order(db, flight, user)
+    assert await route_count(db, caracas, maracaibo) == 2
+
+    # Changing the type stops it counting, changing it back counts it again
+    await order_service.update_service(
+        db, first.id, service_schemas.ServiceUpdate(service_type=ServiceType.HOTEL), user
+    )
+    assert await route_count(db, caracas, maracaibo) == 1
+    await order_service.update_service(
+        db, first.id, service_schemas.ServiceUpdate(service_type=ServiceType.BUS), user
+    )
+    assert await route_count(db, caracas, maracaibo) == 2
+
+    # Reversing the route moves the sale
+    await order_service.update_service(
+        db,
+        second.id,
+        service_schemas.ServiceUpdate(
+            origin_location_id=maracaibo.id, destination_location_id=caracas.id
+        ),
+        user,
+    )
+    assert await route_count(db, caracas, maracaibo) == 1
+    assert await route_count(db, maracaibo, caracas) == 1
+
+    await order_service.delete_service(db, first.id)
+    assert await route_count(db, caracas, maracaibo) == 0
+
+    await db.refresh(user)
+    assert user.sales_count == 1
+
+    await order_service.delete_order(db, order.id)
+    assert await route_count(db, maracaibo, caracas) == 0
+    await db.refresh(user)
+    assert user.sales_count == 0
+
+
+async def test_sales_are_credited_to_the_order_operator(db):
+    owner, customer = await create_operator_and_customer(db)
+    helper = User(email="helper@example.com", full_name="Helper", hashed_password="x")
+    caracas = Location(country="Venezuela", city="Caracas")
+    merida = Location(country="Venezuela", city="Merida")
+    db.add_all([helper, caracas, merida])
+    await db.commit()
+    order = await order_service.create_order(
+        db, order_schemas.OrderCreate(customer_id=customer.id), owner
+    )
+    flight = service_create(
+        order.id,
+        "100",
+        "120",
+        service_type=ServiceType.FLIGHT,
+        name="Flight",
+        origin_location_id=caracas.id,
+        destination_location_id=merida.id,
+    )
+
+    # Another operator adds a service to the owner's order
+    service = await order_service.add_service_to_order(db, flight, helper)
+    await db.commit()
+    await db.refresh(owner)
+    await db.refresh(helper)
+    assert (owner.sales_count, helper.sales_count) == (1, 0)
+    assert await order_service.reconcile_sales_counters(db) == {"popular_trips": 0, "users": 0}
+
+    await order_service.delete_service(db, service.id)
+    await db.commit()
+    await db.refresh(owner)
+    assert owner.sales_count == 0
+
+
+async def test_concurrent_sales_update_counters_atomically(db, session_factory):
+    user, customer = await create_operator_and_customer(db)
+    caracas = Location(country="Venezuela", city="Caracas")
+    merida = Location(country="Venezuela", city="Merida")
+    db.add_all([caracas, merida])
+    await db.commit()
+    sales = 20
+    orders = [
+        await order_service.create_order(db, order_schemas.OrderCreate(customer_id=customer.id), user)
+        for _ in range(sales)
+    ]
+    await db.commit()
+
+    async def sell(order_id: int):
+        async with session_factory() as session:
+            seller = await session.get(User, user.id)
+            flight = service_create(
+                order_id,
+                "100",
+                "120",
+                service_type=ServiceType.FLIGHT,
+                name="Flight",
+                origin_location_id=caracas.id,
+                destination_location_id=merida.id,
+            )
+            await order_service.add_service_to_order(session, flight, seller)
+            await session.commit()
+
+    # The first sales of a new route race to insert its PopularTrip row
+    await asyncio.gather(*(sell(order.id) for order in orders))
+
+    assert await route_count(db, caracas, merida) == sales
+    await db.refresh(user)
+    assert user.sales_count == sales
+
+
+async def test_create_order_with_services_in_bulk(db, statements):
+    user, customer = await create_operator_and_customer(db)
+    caracas = Location(country="Venezuela", city="Caracas")
+    merida = Location(country="Venezuela", city="Merida")
+    db.add_all([caracas, merida])
+    await db.commit()
+
+    def flight(origin: Location, destination: Location) -> dict:
+        return {
+            "service_type": ServiceType.FLIGHT, "name": "Flight", "cost_price": "100", "sale_price": "130",
+            "origin_location_id": origin.id, "destination_location_id": destination.id,
+        }
+
+    order_data = order_schemas.OrderCreateWithServices(
+        customer_id=customer.id,
+        services=[
+            flight(caracas, merida),
+            flight(merida, caracas),
+            {"service_type": ServiceType.HOTEL, "name": "Hotel", "cost_price": "80", "sale_price": "95"},
+            {
+                "service_type": ServiceType.LUGGAGE, "name": "Luggage", "cost_price": "20", "sale_price": "25",
+                "associated_service_index": 0,
+            },
+        ],
+    )
+    statements.clear()
+    order = await order_service.create_order_with_services(db, order_data, user)
+    await db.commit()
+
+    assert sum(statement.startswith("INSERT INTO services") for statement in statements) == 1
+    assert (order.total_cost_price, order.total_sale_price) == (Decimal("300.00"), Decimal("380.00"))
+    services = sorted(order.services, key=lambda service: service.id)
+    assert [service.name for service in services] == ["Flight", "Flight", "Hotel", "Luggage"]
+    assert services[3].associated_service_id == services[0].id
+
+    assert await route_count(db, caracas, merida) == 1
+    assert await route_count(db, merida, caracas) == 1
+    await db.refresh(user)
+    assert user.sales_count == 2
+
+    incremental = await rollup_rows(db)
+    await daily_stats_service.rebuild_daily_stats(db)
+    assert incremental == await rollup_rows(db)
+
+    # Luggage cannot point at itself
+    invalid = order_schemas.OrderCreateWithServices(
+        customer_id=customer.id,
+        services=[{**order_data.services[3].model_dump(), "associated_service_index": 0}],
+    )
+    with pytest.raises(ValueError, match="associated_service_index"):
+        await order_service.create_order_with_services(db, invalid, user)
+
+
+async def test_concurrent_orders_get_unique_readable_numbers(db, session_factory, statements):
+    user, customer = await create_operator_and_customer(db)
+
+    async def create(count: int) -> list[str]:
+        async with session_factory() as session:
+            seller = await session.get(User, user.id)
+            numbers = []
+            for _ in range(count):
+                order_data = order_schemas.OrderCreate(customer_id=customer.id)
+                order = await order_service.create_order(session, order_data, seller)
+                numbers.append(order.order_number)
+            await session.commit()
+            return numbers
+
+    statements.clear()
+    batches = await asyncio.gather(*(create(25) for _ in range(8)))
+    numbers = [number for batch in batches for number in batch]
+
+    assert len(numbers) == len(set(numbers)) == 200
+    assert all(re.fullmatch(r"ORD-\d{4}-\d{6,}", number) for number in numbers)
+    # Numbered inside the INSERT: no separate nextval round trip
+    assert not any("nextval" in statement and not statement.startswith("INSERT") for statement in statements)
+    assert await db.scalar(select(func.count(func.distinct(Order.order_number)))) == 200
+
+
+async def test_reconcile_sales_counters_repairs_drift(db):
+    user, customer = await create_operator_and_customer(db)
+    caracas = Location(country="Venezuela", city="Caracas")
+    merida = Location(country="Venezuela", city="Merida")
+    db.add_all([caracas, merida])
+    await db.commit()
+    order = await order_service.create_order(
+        db, order_schemas.OrderCreate(customer_id=customer.id), user
+    )
+    await order_service.add_service_to_order(
+        db,
+        service_create(
+            order.id,
+            "10",
+            "20",
+            service_type=ServiceType.BUS,
+            name="Bus",
+            origin_location_id=caracas.id,
+            destination_location_id=merida.id,
+        ),
+        user,
+    )
+
+    # Simulate drift: a lost counter row and a wrong operator count
+    await db.execute(delete(PopularTrip))
+    user.sales_count = 7
+    await db.commit()
+
+    repaired = await order_service.reconcile_sales_counters(db)
+
+    assert repaired == {"popular_trips": 1, "users": 1}
+    assert await route_count(db, caracas, merida) == 1
+    await db.refresh(user)
+    assert user.sales_count == 1
+    assert await order_service.reconcile_sales_counters(db) == {"popular_trips": 0, "users": 0}
+
+
+async def test_stats_cache_is_invalidated_by_sales(db, statements):
+    user, customer = await create_operator_and_customer(db)
+
+    first = await stats_service.get_dashboard_metrics(db)
+    statements.clear()
+    assert await stats_service.get_dashboard_metrics(db) == first
+    assert statements == []
+
+    # Nothing is invalidated until the write commits, nor by a rollback
+    order_data = order_schemas.OrderCreate(customer_id=customer.id)
+    await order_service.create_order(db, order_data, user)
+    await db.rollback()
+    statements.clear()
+    assert await stats_service.get_dashboard_metrics(db) == first
+    assert statements == []
+
+    await db.refresh(user)
+    await order_service.create_order(db, order_data, user)
+    await order_service.create_order(db, order_data, user)
+    assert await stats_service.get_dashboard_metrics(db) == first
+    await db.commit()
+    fresh = await stats_service.get_dashboard_metrics(db)
+
+    assert fresh["total_orders"] == first["total_orders"] + 2
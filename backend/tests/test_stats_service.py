@@ -0,0 +1,233 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from app.models.customer import Customer
+from app.models.location import Location
+from app.models.order import Order
+from app.models.popular_trip import PopularTrip
+from app.models.user import User
+from app.services import daily_stats_service, stats_service
+
+
+async def seed_orders(db, created_ats: list[datetime], profit: Decimal = Decimal("10.00")) -> None:
+    """Insert one customer and one order per timestamp and rebuild the rollup."""
+    customer = Customer(full_name="Test Customer", created_at=datetime.now())
+    db.add(customer)
+    await db.flush()
+    db.add_all(
+        Order(
+            order_number=f"ORD-TEST-{index}",
+            customer_id=customer.id,
+            total_cost_price=Decimal("100.00"),
+            total_sale_price=Decimal("100.00") + profit,
+            created_at=created_at,
+        )
+        for index, created_at in enumerate(created_ats)
+    )
+    await db.commit()
+    await daily_stats_service.rebuild_daily_stats(db)
+
+
+async def test_dashboard_metrics_single_statement(db, statements):
+    now = datetime.now()
+    await seed_orders(
+        db,
+        [
+            now - timedelta(days=1),
+            now - timedelta(days=2),
+            now - timedelta(days=40),
+            now - timedelta(days=90),
+        ],
+    )
+    statements.clear()
+
+    metrics = await stats_service.get_dashboard_metrics(db)
+
+    assert len(statements) == 1
+    assert metrics["total_customers"] == 1
+    assert metrics["total_orders"] == 4
+    assert metrics["total_paid_orders"] == 4
+    assert metrics["total_profit"] == Decimal("40.00")
+    # 2 orders in the last 30 days vs 1 in the previous 30 days
+    assert metrics["orders_growth"] == 100.0
+    # The only customer is recent and there is no baseline
+    assert metrics["customers_growth"] == 0.0
+
+
+async def test_targets_single_statement(db, statements):
+    today_start = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    year_start = today_start.replace(month=1, day=1)
+    await seed_orders(
+        db,
+        [
+            # Start of the current UTC day: "today" whenever the test runs
+            today_start,
+            year_start.replace(year=year_start.year - 1),
+            year_start - timedelta(days=400),
+        ],
+    )
+    statements.clear()
+
+    targets = await stats_service.get_targets(db)
+
+    assert len(statements) == 1
+    assert set(targets) == {"daily", "monthly", "annual"}
+    assert targets["daily"]["profit"] == "$10"
+    assert targets["annual"]["profit"] == "$10"
+    # Only one order falls in the previous year window
+    assert targets["annual"]["percentage_change"] == "+0%"
+    assert targets["annual"]["current_label"] == "This Month"
+
+
+async def test_targets_rejects_unknown_type(db):
+    with pytest.raises(ValueError):
+        await stats_service.get_targets(db, ["weekly"])
+
+
+async def explain(db, stmt) -> str:
+    """
+    Return the PostgreSQL plan for a statement with sequential scans disabled.
+
+    With seq scans off a non-sargable predicate still falls back to a full
+    index scan, so tests check for an Index Cond on the range instead.
+    """
+    compiled = stmt.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    result = await db.execute(text(f"EXPLAIN {compiled}"))
+    return "\n".join(row[0] for row in result)
+
+
+async def seed_years(db) -> None:
+    """Spread orders over several years so a single year is a small slice."""
+    start = datetime(2016, 1, 1)
+    await seed_orders(db, [start + timedelta(days=day) for day in range(0, 3650, 2)])
+    await db.execute(text("ANALYZE order_daily_stats"))
+
+
+async def test_monthly_sales_uses_rollup_day_index(db):
+    await seed_years(db)
+
+    plan = await explain(db, stats_service._monthly_sales_stmt(2020))
+
+    assert "order_daily_stats_pkey" in plan
+    assert "Index Cond: ((day >=" in plan
+
+
+async def test_statistics_chart_uses_rollup_day_index(db):
+    await seed_years(db)
+
+    plan = await explain(db, stats_service._statistics_chart_stmt(2020))
+
+    assert "order_daily_stats_pkey" in plan
+    assert "Index Cond: ((day >=" in plan
+
+
+async def test_monthly_sales_growth_and_revenue(db):
+    await seed_orders(
+        db,
+        [datetime(2023, 3, 10), datetime(2024, 3, 10), datetime(2024, 3, 11), datetime(2024, 12, 31)],
+    )
+
+    data = await stats_service.get_monthly_sales(db, 2024)
+
+    assert data["sales"][2] == 2
+    assert data["sales"][11] == 1
+    assert data["total_sales"] == "$330"
+    assert data["growth"] == "+200%"
+
+
+async def test_profit_stats_groups_rollup_by_month(db):
+    await seed_orders(db, [datetime(2024, 1, 5), datetime(2024, 1, 20), datetime(2024, 2, 1)])
+
+    data = await stats_service.get_profit_stats(db, start_date=datetime(2024, 1, 1))
+
+    assert [item["order_count"] for item in data["stats"]] == [2, 1]
+    assert data["stats"][0]["period"].startswith("2024-01-01")
+    assert data["summary"]["total_profit"] == 30.0
+    assert data["summary"]["order_count"] == 3
+
+
+async def test_popular_trips_single_statement(db, statements):
+    locations = [Location(country="Venezuela", city=f"City {index}") for index in range(6)]
+    db.add_all(locations)
+    await db.flush()
+    # Route i -> i+1 has been sold i times
+    db.add_all(
+        PopularTrip(
+            origin_location_id=locations[index].id,
+            destination_location_id=locations[index + 1].id,
+            sales_count=index,
+        )
+        for index in range(5)
+    )
+    await db.commit()
+    statements.clear()
+
+    trips = await stats_service.get_popular_trips(db, limit=100)
+
+    assert len(statements) == 1
+    # Routes without sales are left out of the ranking
+    assert [trip["sales_count"] for trip in trips] == [4, 3, 2, 1]
+    assert trips[0]["origin_location"].city == "City 4"
+    assert trips[0]["destination_location"].city == "City 5"
+
+
+async def test_dashboard_runs_sections_on_separate_sessions(session_factory, db):
+    await seed_orders(db, [datetime(2024, 5, 1), datetime(2024, 6, 1)])
+    opened = []
+
+    def counting_factory():
+        opened.append(True)
+        return session_factory()
+
+    dashboard = await stats_service.get_dashboard(2024, session_factory=counting_factory)
+
+    sections = {"metrics", "targets", "monthly_sales", "statistics_chart", "popular_trips", "top_sellers"}
+    assert len(opened) == len(sections)
+    assert set(dashboard["timings_ms"]) == sections | {"total"}
+    assert dashboard["metrics"]["total_orders"] == 2
+    assert dashboard["monthly_sales"]["sales"][4:6] == [1, 1]
+    assert set(dashboard["targets"]) == {"daily", "monthly", "annual"}
+
+
+async def test_top_sellers_in_window_ranks_by_orders(db, statements):
+    ana = User(email="ana@example.com", full_name="Ana", hashed_password="x")
+    luis = User(email="luis@example.com", full_name="Luis", hashed_password="x")
+    customer = Customer(full_name="Customer")
+    db.add_all([ana, luis, customer])
+    await db.flush()
+    sales = [
+        (ana, datetime(2024, 3, 1)),
+        (luis, datetime(2024, 3, 2)),
+        (luis, datetime(2024, 3, 3)),
+        (ana, datetime(2024, 4, 1)),
+    ]
+    db.add_all(
+        Order(
+            order_number=f"ORD-SELLER-{index}",
+            user_id=user.id,
+            customer_id=customer.id,
+            total_cost_price=Decimal("10"),
+            total_sale_price=Decimal("15"),
+            created_at=created_at,
+        )
+        for index, (user, created_at) in enumerate(sales)
+    )
+    await db.commit()
+    statements.clear()
+
+    march = await stats_service.get_top_sellers_in_window(
+        db, start_date=datetime(2024, 3, 1), end_date=datetime(2024, 4, 1)
+    )
+    again = await stats_service.get_top_sellers_in_window(
+        db, start_date=datetime(2024, 3, 1), end_date=datetime(2024, 4, 1)
+    )
+
+    # One query, the closed window is served from cache the second time
+    assert len(statements) == 1
+    assert again == march
+    assert [(seller["full_name"], seller["order_count"]) for seller in march] == [("Luis", 2), ("Ana", 1)]
+    assert march[0]["total_profit"] == Decimal("10.00")
@@ -0,0 +1,76 @@
+import re
+import zipfile
+from io import BytesIO
+
+import pytest
+from sqlalchemy import select
+
+from app.core import workers
+from app.core.config import settings
+from app.models.order import Order
+from app.models.service import Service
+from app.services import voucher_service
+from tests.test_export_service import seed_export_orders
+
+
+async def seed_voucher_orders(db) -> list[int]:
+    """Seed the export orders, with a PNR and route guide on the flight. Returns the order IDs."""
+    await seed_export_orders(db)
+    flight = (await db.execute(select(Service).where(Service.name == "Flight"))).scalar_one()
+    flight.pnr_code = "ABC123"
+    flight.route_guide = "CCS - BOG"
+    await db.commit()
+    return list((await db.execute(select(Order.id).order_by(Order.id))).scalars())
+
+
+@pytest.fixture(autouse=True)
+def voucher_pool(monkeypatch):
+    """Render vouchers in a dedicated two-process pool, so arguments must pickle."""
+    pool = workers.create_render_pool("process", 2)
+    monkeypatch.setattr(workers, "_voucher_pool", pool)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def page_count(pdf: bytes) -> int:
+    return len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+
+
+async def test_voucher_orders_carry_services_in_requested_order(db):
+    first, second = await seed_voucher_orders(db)
+
+    orders = await voucher_service.load_voucher_orders(db, [second, first, second])
+
+    assert [order.order_number for order in orders] == ["ORD-2", "ORD-1"]
+    flight, hotel = orders[1].services
+    assert (flight.reference, flight.route_guide) == ("ABC123", "CCS - BOG")
+    assert (flight.origin, flight.destination) == ("Caracas, Venezuela", "Bogota, Cundinamarca, Colombia")
+    assert hotel.status == "cancelado"
+
+    with pytest.raises(ValueError, match="not found: 999"):
+        await voucher_service.load_voucher_orders(db, [first, 999])
+
+
+async def test_merged_voucher_pdf_has_one_page_per_order_and_shared_page_form(db):
+    order_ids = await seed_voucher_orders(db)
+
+    pdf = (await voucher_service.build_vouchers(db, order_ids, "pdf")).read_bytes()
+
+    assert pdf.startswith(b"%PDF")
+    assert page_count(pdf) == 2
+    # The static page frame is stored once and referenced from every page
+    assert len(re.findall(rb"/Subtype /Form", pdf)) == 1
+
+
+async def test_voucher_zip_renders_chunks_in_process_pool(db, monkeypatch):
+    order_ids = await seed_voucher_orders(db)
+    monkeypatch.setattr(settings, "VOUCHER_CHUNK_SIZE", 1)
+
+    archive = (await voucher_service.build_vouchers(db, order_ids, "zip")).read_bytes()
+
+    with zipfile.ZipFile(BytesIO(archive)) as zf:
+        assert zf.namelist() == ["voucher_ORD-1.pdf", "voucher_ORD-2.pdf"]
+        assert all(page_count(zf.read(name)) == 1 for name in zf.namelist())
+
+    with pytest.raises(ValueError, match="Invalid voucher format"):
+        await voucher_service.build_vouchers(db, order_ids, "docx")